@@ -6,15 +6,67 @@
 """
 
 import json
+import os
+import pickle
 import pandas as pd
 from pathlib import Path
 from datetime import datetime
 import logging
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # ロギング設定
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _load_json(path):
+    """JSONファイルを読み込む（orjsonがあれば高速にデコード）"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def _load_cached(path):
+    """
+    JSONファイルを読み込む（pickleのサイドカーキャッシュを利用）
+    
+    サイドカーには元ファイルの(更新時刻ns, サイズ)を一緒に保存し、
+    どちらかが変わっていればJSONを読み直す（同じ秒内の書き換えや時刻を保ったコピーにも対応）
+    """
+    path = Path(path)
+    sidecar = path.with_name(path.name + '.pickle')
+    stat = path.stat()
+    key = (stat.st_mtime_ns, stat.st_size)
+    try:
+        with open(sidecar, 'rb') as f:
+            cached = pickle.load(f)
+        if isinstance(cached, tuple) and len(cached) == 2 and cached[0] == key:
+            return cached[1]
+    except (OSError, EOFError, pickle.UnpicklingError):
+        pass
+    
+    data = _load_json(path)
+    try:
+        with open(sidecar, 'wb') as f:
+            pickle.dump((key, data), f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError as e:
+        logger.warning(f"{sidecar}の書き込みエラー: {e}")
+    return data
+
+def _merge_unique(data, all_data, seen_urls):
+    """URLで重複を除きながらデータを追加"""
+    # seen_urlsはall_dataに残すアイテムのURL文字列をそのまま参照するため、
+    # ハッシュ値に置き換えてもメモリは減らない（衝突のリスクだけが増える）
+    for item in data:
+        url = item.get('url')
+        if url and url not in seen_urls:
+            all_data.append(item)
+            seen_urls.add(url)
+
 def combine_all_data():
     """すべての既存データを統合"""
     all_data = []
@@ -30,40 +82,47 @@ def combine_all_data():
     for file_path in cache_files:
         if Path(file_path).exists():
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    if isinstance(data, list):
-                        for item in data:
-                            if item.get('url') and item['url'] not in seen_urls:
-                                all_data.append(item)
-                                seen_urls.add(item['url'])
-                        logger.info(f"{file_path}: {len(data)}件読み込み")
+                data = _load_cached(file_path)
+                if isinstance(data, list):
+                    _merge_unique(data, all_data, seen_urls)
+                    logger.info(f"{file_path}: {len(data)}件読み込み")
+                del data
             except Exception as e:
                 logger.error(f"{file_path}の読み込みエラー: {e}")
     
-    # JSONファイルから読み込み
-    json_pattern = "output/restaurant_list*.json"
-    for json_file in Path().glob(json_pattern):
+    # JSONファイルから読み込み（globのパターン照合を避け、名前の前方・後方一致で絞り込む）
+    try:
+        with os.scandir('output') as entries:
+            json_files = [
+                entry.path for entry in entries
+                if entry.name.startswith('restaurant_list') and entry.name.endswith('.json')
+                and entry.is_file()
+            ]
+    except FileNotFoundError:
+        json_files = []
+    
+    for json_file in json_files:
         try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                if isinstance(data, list):
-                    for item in data:
-                        if item.get('url') and item['url'] not in seen_urls:
-                            all_data.append(item)
-                            seen_urls.add(item['url'])
-                    logger.info(f"{json_file}: {len(data)}件読み込み")
+            data = _load_cached(json_file)
+            if isinstance(data, list):
+                _merge_unique(data, all_data, seen_urls)
+                logger.info(f"{json_file}: {len(data)}件読み込み")
+            del data
         except Exception as e:
             logger.error(f"{json_file}の読み込みエラー: {e}")
     
     logger.info(f"\n統合結果: 合計{len(all_data)}件（重複除去後）")
     
     # データ品質の分析
-    with_phone = sum(1 for d in all_data if d.get('phone'))
-    with_address = sum(1 for d in all_data if d.get('address'))
-    with_genre = sum(1 for d in all_data if d.get('genre'))
-    with_station = sum(1 for d in all_data if d.get('station'))
-    with_hours = sum(1 for d in all_data if d.get('open_time'))
+    quality_fields = ['phone', 'address', 'genre', 'station', 'open_time']
+    df = pd.DataFrame(all_data).reindex(columns=quality_fields)
+    counts = df.fillna('').astype(bool).sum()
+    with_phone = int(counts['phone'])
+    with_address = int(counts['address'])
+    with_genre = int(counts['genre'])
+    with_station = int(counts['station'])
+    with_hours = int(counts['open_time'])
+    del df
     
     logger.info("\n📊 データ品質分析:")
     logger.info(f"  電話番号あり: {with_phone}件 ({with_phone/len(all_data)*100:.1f}%)")
@@ -7,17 +7,23 @@
 """
 
 import asyncio
-import aiohttp
+import gzip
+import hashlib
 import json
+import os
 import re
 import random
-import pandas as pd
+import time
 from datetime import datetime
 from typing import Dict, Optional
 from bs4 import BeautifulSoup
 from pathlib import Path
 import logging
-from aiohttp import ClientTimeout, TCPConnector
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # ロギング設定
 logging.basicConfig(
@@ -30,17 +36,74 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 生HTMLから直接抽出するための正規表現（DOMを構築せずに1回の走査で取得）
+SEATS_RE = re.compile(r'(?:席数|座席)\s*</th>\s*<td[^>]*>(.*?)</td>', re.S)
+HP_RE = re.compile(r'(?:ホームページ|公式|HP)\s*</th>\s*<td[^>]*>(?:(?!</td>).)*?href="([^"]+)"', re.S)
+SNS_RE = re.compile(r'href="([^"]*(?:instagram\.com|twitter\.com|x\.com|facebook\.com)[^"]*)"')
+REVIEW_RE = re.compile(r'class="[^"]*(?:rstdtl|rdheader)-rating__review-count[^"]*"[^>]*>(?:\s*<[^>]+>)*\s*(\d+)')
+RATING_RE = re.compile(r'class="[^"]*(?:rdheader-rating__score-val-dtl|c-rating__val)[^"]*"[^>]*>(?:\s*<[^>]+>)*\s*(\d+\.\d+)')
+BUDGET_DINNER_RE = re.compile(r'(?:夜|ディナー)[^¥]{0,120}?(¥[\d,]+\s*[~～-]\s*¥[\d,]+)', re.S)
+BUDGET_LUNCH_RE = re.compile(r'(?:昼|ランチ)[^¥]{0,120}?(¥[\d,]+\s*[~～-]\s*¥[\d,]+)', re.S)
+TAG_RE = re.compile(r'<[^>]+>')
+
+# 取得済みHTMLのディスクキャッシュ（再実行時は通信せずに再利用）
+HTML_CACHE_DIR = Path('cache/html')
+HTML_CACHE_TTL = 7 * 24 * 60 * 60  # 7日
+
+# 並行ワーカー数
+WORKER_COUNT = 8
+
+# 進捗保存の最短間隔（秒）
+CHECKPOINT_INTERVAL = 30
+
+# DOMフォールバック用の正規表現
+SEATS_LABEL_RE = re.compile('席数|座席')
+HP_LABEL_RE = re.compile('ホームページ|公式|HP')
+NUM_RE = re.compile(r'(\d+)')
+RATING_VALUE_RE = re.compile(r'(\d+\.\d+)')
+BUDGET_RE = re.compile(r'¥[\d,]+\s*[~～-]\s*¥[\d,]+')
+SNS_HOSTS = ('instagram.com', 'twitter.com', 'x.com', 'facebook.com')
+
+def _load_json(path) -> list:
+    """JSONファイルを読み込む（orjsonがあれば高速にデコード）"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def _dump_json(data, path):
+    """JSONファイルに書き込む（orjsonがあれば高速にエンコード）"""
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+def _write_checkpoint(data, path: Path):
+    """進捗を一時ファイル経由で保存（中断されても壊れたファイルを残さない）"""
+    tmp = path.with_name(path.name + '.tmp')
+    _dump_json(data, tmp)
+    os.replace(tmp, path)
+
 class DataEnhancer:
     """既存データ拡張クラス"""
     
     def __init__(self):
         self.session = None
-        self.semaphore = asyncio.Semaphore(3)  # 同時接続数を制限
+        self.semaphore = asyncio.Semaphore(8)  # 同時接続数を制限
         self.delay = 5.0  # 基本遅延
+        HTML_CACHE_DIR.mkdir(parents=True, exist_ok=True)
         
     async def __aenter__(self):
-        timeout = ClientTimeout(total=30)
+        # aiohttpは通信時のみ必要なためここでインポート
+        import aiohttp
+        
+        timeout = aiohttp.ClientTimeout(total=30)
+        connector = aiohttp.TCPConnector(limit_per_host=4)
         self.session = aiohttp.ClientSession(
+            connector=connector,
             timeout=timeout,
             headers={
                 'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
@@ -54,15 +117,44 @@ class DataEnhancer:
         if self.session:
             await self.session.close()
     
+    def _cache_path(self, url: str) -> Path:
+        """URLに対応するキャッシュファイルのパス"""
+        return HTML_CACHE_DIR / (hashlib.sha1(url.encode('utf-8')).hexdigest() + '.html.gz')
+    
+    def _read_cache(self, url: str) -> Optional[str]:
+        """有効期限内のキャッシュがあれば返す"""
+        path = self._cache_path(url)
+        try:
+            if time.time() - path.stat().st_mtime > HTML_CACHE_TTL:
+                return None
+            return gzip.decompress(path.read_bytes()).decode('utf-8')
+        except (OSError, EOFError, UnicodeDecodeError):
+            return None
+    
+    def _write_cache(self, url: str, html: str):
+        """取得したHTMLをキャッシュに保存"""
+        try:
+            self._cache_path(url).write_bytes(gzip.compress(html.encode('utf-8'), compresslevel=5))
+        except OSError as e:
+            logger.warning(f"キャッシュ保存エラー {url}: {e}")
+    
     async def fetch_page(self, url: str) -> Optional[str]:
         """ページを取得"""
+        # キャッシュヒット時はアクセスしないので遅延も不要
+        cached = self._read_cache(url)
+        if cached is not None:
+            return cached
+        
+        # 待機中は接続枠を占有しないようセマフォの外で遅延
+        await asyncio.sleep(self.delay + random.uniform(0, 2))
+        
         async with self.semaphore:
-            await asyncio.sleep(self.delay + random.uniform(0, 2))
-            
             try:
                 async with self.session.get(url) as response:
                     if response.status == 200:
-                        return await response.text()
+                        html = await response.text()
+                        self._write_cache(url, html)
+                        return html
                     elif response.status == 429:
                         logger.warning(f"レート制限: {url}")
                         await asyncio.sleep(30)
@@ -73,6 +165,56 @@ class DataEnhancer:
                 logger.error(f"取得エラー {url}: {e}")
                 return None
     
+    def extract_additional_info_fast(self, html: str) -> Dict[str, str]:
+        """生HTMLから正規表現で追加情報を抽出（すべて取得できなければDOM解析にフォールバック）"""
+        info = {
+            'seats': '',
+            'official_url': '',
+            'review_count': '0',
+            'rating': '',
+            'budget_dinner': '',
+            'budget_lunch': ''
+        }
+        
+        # 席数
+        match = SEATS_RE.search(html)
+        if match:
+            text = TAG_RE.sub('', match.group(1)).strip()
+            number = NUM_RE.search(text)
+            if number:
+                info['seats'] = number.group(1) + "席"
+            elif '席' in text:
+                info['seats'] = text
+        
+        # 公式URL（ホームページ）、なければSNSリンク
+        match = HP_RE.search(html) or SNS_RE.search(html)
+        if match:
+            info['official_url'] = match.group(1)
+        
+        # 口コミ数
+        match = REVIEW_RE.search(html)
+        if match:
+            info['review_count'] = match.group(1)
+        
+        # 評価点
+        match = RATING_RE.search(html)
+        if match:
+            info['rating'] = match.group(1)
+        
+        # 予算（夜・昼）
+        match = BUDGET_DINNER_RE.search(html)
+        if match:
+            info['budget_dinner'] = match.group(1)
+        match = BUDGET_LUNCH_RE.search(html)
+        if match:
+            info['budget_lunch'] = match.group(1)
+        
+        # 1項目も取得できない場合はページ構造が異なるためDOM解析で再試行
+        if info['review_count'] == '0' and not any(info[k] for k in ('seats', 'official_url', 'rating', 'budget_dinner', 'budget_lunch')):
+            return self.extract_additional_info(BeautifulSoup(html, 'lxml'))
+        
+        return info
+    
     def extract_additional_info(self, soup: BeautifulSoup) -> Dict[str, str]:
         """追加情報を抽出"""
         info = {
@@ -85,13 +227,13 @@ class DataEnhancer:
         }
         
         # 席数
-        for th in soup.find_all(['th', 'td'], string=re.compile('席数|座席')):
+        for th in soup.find_all(['th', 'td'], string=SEATS_LABEL_RE):
             next_elem = th.find_next_sibling()
             if next_elem:
                 text = next_elem.get_text(strip=True)
                 if text:
                     # 数字を抽出
-                    match = re.search(r'(\d+)', text)
+                    match = NUM_RE.search(text)
                     if match:
                         info['seats'] = match.group(1) + "席"
                     elif '席' in text:
@@ -99,7 +241,7 @@ class DataEnhancer:
                     break
         
         # 公式URL（ホームページ）
-        for th in soup.find_all(['th', 'td'], string=re.compile('ホームページ|公式|HP')):
+        for th in soup.find_all(['th', 'td'], string=HP_LABEL_RE):
             next_elem = th.find_next_sibling()
             if next_elem:
                 link = next_elem.find('a')
@@ -111,7 +253,7 @@ class DataEnhancer:
         if not info['official_url']:
             for link in soup.find_all('a', href=True):
                 href = link.get('href', '')
-                if any(sns in href for sns in ['instagram.com', 'twitter.com', 'x.com', 'facebook.com']):
+                if any(sns in href for sns in SNS_HOSTS):
                     info['official_url'] = href
                     break
         
@@ -119,7 +261,7 @@ class DataEnhancer:
         review_elem = soup.select_one('em.rstdtl-rating__review-count, em.rdheader-rating__review-count')
         if review_elem:
             text = review_elem.get_text(strip=True)
-            match = re.search(r'(\d+)', text)
+            match = NUM_RE.search(text)
             if match:
                 info['review_count'] = match.group(1)
         
@@ -127,58 +269,54 @@ class DataEnhancer:
         rating_elem = soup.select_one('span.rdheader-rating__score-val-dtl, b.c-rating__val')
         if rating_elem:
             text = rating_elem.get_text(strip=True)
-            match = re.search(r'(\d+\.\d+)', text)
+            match = RATING_VALUE_RE.search(text)
             if match:
                 info['rating'] = match.group(1)
         
-        # 予算（夜）
-        for elem in soup.find_all(string=re.compile('夜|ディナー')):
-            parent = elem.parent
-            if parent:
-                text = parent.get_text(strip=True)
-                match = re.search(r'¥[\d,]+\s*[~～-]\s*¥[\d,]+', text)
-                if match:
-                    info['budget_dinner'] = match.group()
-                    break
+        # 予算（夜）- 全テキストノードを走査せず予算欄のアンカーから直接取得
+        dinner_elem = soup.select_one('em.gly-b-dinner ~ *, .rdheader-budget__icon--dinner + .rdheader-budget__price')
+        if dinner_elem:
+            match = BUDGET_RE.search(dinner_elem.get_text(strip=True))
+            if match:
+                info['budget_dinner'] = match.group()
         
         # 予算（昼）
-        for elem in soup.find_all(string=re.compile('昼|ランチ')):
-            parent = elem.parent
-            if parent:
-                text = parent.get_text(strip=True)
-                match = re.search(r'¥[\d,]+\s*[~～-]\s*¥[\d,]+', text)
-                if match:
-                    info['budget_lunch'] = match.group()
-                    break
+        lunch_elem = soup.select_one('em.gly-b-lunch ~ *, .rdheader-budget__icon--lunch + .rdheader-budget__price')
+        if lunch_elem:
+            match = BUDGET_RE.search(lunch_elem.get_text(strip=True))
+            if match:
+                info['budget_lunch'] = match.group()
         
         return info
     
-    async def enhance_restaurant(self, restaurant: Dict) -> Dict:
-        """レストラン情報を拡張"""
+    async def enhance_restaurant(self, restaurant: Dict) -> Optional[Dict]:
+        """
+        レストラン情報を拡張
+        
+        URLがない・ページを取得できなかった場合はNoneを返す（元データは変更しない）
+        """
         url = restaurant.get('url', '')
         if not url:
-            return restaurant
+            return None
         
         logger.info(f"処理中: {restaurant.get('shop_name', 'Unknown')}")
         
         html = await self.fetch_page(url)
         if not html:
             logger.warning(f"  取得失敗: {url}")
-            return restaurant
+            return None
         
-        soup = BeautifulSoup(html, 'html.parser')
-        additional_info = self.extract_additional_info(soup)
+        additional_info = self.extract_additional_info_fast(html)
         
-        # 既存データに追加情報をマージ
-        enhanced = restaurant.copy()
-        enhanced.update(additional_info)
+        # 既存データに追加情報をマージ（呼び出し側で元データは不要なのでコピーせず更新）
+        restaurant.update(additional_info)
         
         logger.info(f"  ✅ 席数: {additional_info['seats'] or 'N/A'}")
         logger.info(f"  ✅ 公式URL: {additional_info['official_url'] or 'N/A'}")
         logger.info(f"  ✅ 口コミ数: {additional_info['review_count']}")
         logger.info(f"  ✅ 評価: {additional_info['rating'] or 'N/A'}")
         
-        return enhanced
+        return restaurant
 
 
 async def main():
@@ -189,40 +327,77 @@ async def main():
         logger.error("既存データファイルが見つかりません")
         return
     
-    with open(existing_file, 'r', encoding='utf-8') as f:
-        existing_data = json.load(f)
+    existing_data = _load_json(existing_file)
     
     logger.info(f"📊 既存データ: {len(existing_data)}件")
     
-    # データ拡張
+    # 前回の進捗があれば処理済みのものを除外して再開
+    # （チェックポイントには拡張できたレコードだけを保存するので、取得に失敗したURLは再開時に再試行される）
+    checkpoint_file = Path('cache/enhanced_partial.json')
     enhanced_data = []
+    if checkpoint_file.exists():
+        enhanced_data = _load_json(checkpoint_file)
+    done_urls = {r['url'] for r in enhanced_data if r.get('url')}
+    todo = [r for r in existing_data if r.get('url') not in done_urls]
+    if done_urls:
+        logger.info(f"🔄 再開: {len(done_urls)}件済 / {len(todo)}件残")
+    
+    # 拡張できなかったレコード（最終出力には元データのまま含める）
+    not_enhanced = []
     
     async with DataEnhancer() as enhancer:
-        # バッチ処理
-        batch_size = 10
-        for i in range(0, len(existing_data), batch_size):
-            batch = existing_data[i:i+batch_size]
-            
-            logger.info(f"\n📦 バッチ {i//batch_size + 1}/{(len(existing_data) + batch_size - 1)//batch_size}")
-            
-            tasks = [enhancer.enhance_restaurant(r) for r in batch]
-            results = await asyncio.gather(*tasks)
-            enhanced_data.extend(results)
-            
-            # 進捗保存
-            if len(enhanced_data) % 50 == 0:
-                with open('cache/enhanced_partial.json', 'w', encoding='utf-8') as f:
-                    json.dump(enhanced_data, f, ensure_ascii=False, indent=2)
-                logger.info(f"💾 進捗保存: {len(enhanced_data)}件")
+        # ワーカープール（バッチ単位の待ち合わせをなくし、常に一定数を並行処理）
+        queue = asyncio.Queue()
+        for restaurant in todo:
+            queue.put_nowait(restaurant)
+        
+        loop = asyncio.get_running_loop()
+        last_save = time.monotonic()
+        saving = False
+        
+        async def worker():
+            nonlocal last_save, saving
+            while True:
+                try:
+                    restaurant = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                enhanced = await enhancer.enhance_restaurant(restaurant)
+                if enhanced is not None:
+                    enhanced_data.append(enhanced)
+                else:
+                    not_enhanced.append(restaurant)
+                queue.task_done()
+                
+                # 進捗保存（書き込みはイベントループを止めないよう別スレッドで実行）
+                if not saving and time.monotonic() - last_save > CHECKPOINT_INTERVAL:
+                    saving = True
+                    snapshot = list(enhanced_data)
+                    try:
+                        await loop.run_in_executor(None, _write_checkpoint, snapshot, checkpoint_file)
+                    finally:
+                        saving = False
+                        last_save = time.monotonic()
+                    logger.info(f"💾 進捗保存: {len(snapshot)}/{len(existing_data)}件")
+        
+        await asyncio.gather(*(worker() for _ in range(WORKER_COUNT)))
     
-    # 最終保存
+    # 最終保存（拡張できたレコードのみをチェックポイントに残し、出力には未拡張のものも含める）
+    _write_checkpoint(list(enhanced_data), checkpoint_file)
+    if not_enhanced:
+        logger.warning(f"⚠️ 拡張できなかったレコード: {len(not_enhanced)}件（次回の実行で再試行）")
+    enhanced_data.extend(not_enhanced)
     output_file = 'cache/enhanced_results_final.json'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(enhanced_data, f, ensure_ascii=False, indent=2)
+    _dump_json(enhanced_data, output_file)
     
     logger.info(f"\n✅ 拡張完了: {len(enhanced_data)}件")
     
     # Excel出力
+    import pandas as pd
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+    from openpyxl.utils import get_column_letter
     df = pd.DataFrame(enhanced_data)
     
     # カラムの順序を整理
@@ -240,22 +415,31 @@ async def main():
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     excel_file = f'output/東京都_飲食店リスト_拡張_1200件_{timestamp}.xlsx'
     
-    with pd.ExcelWriter(excel_file, engine='openpyxl') as writer:
-        df.to_excel(writer, sheet_name='飲食店リスト', index=False)
-        
-        # カラム幅調整
-        worksheet = writer.sheets['飲食店リスト']
-        for column in worksheet.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            worksheet.column_dimensions[column_letter].width = adjusted_width
+    # カラム幅（各列の最大文字列長をpandasで一括計算）
+    col_widths = {
+        col: min(max(int(df[col].astype(str).str.len().max()), len(col)) + 2, 50)
+        for col in df.columns
+    }
+    
+    # write_onlyモードで1行ずつディスクへ書き出す（ブック全体をメモリに保持しない）
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet('飲食店リスト')
+    
+    # カラム幅調整（write_onlyモードでは行の書き込み前に設定する必要がある）
+    for idx, col in enumerate(df.columns, 1):
+        worksheet.column_dimensions[get_column_letter(idx)].width = col_widths[col]
+    
+    header = []
+    for col in df.columns:
+        cell = WriteOnlyCell(worksheet, value=col)
+        cell.font = Font(bold=True)
+        header.append(cell)
+    worksheet.append(header)
+    
+    for row in df.fillna('').itertuples(index=False, name=None):
+        worksheet.append(row)
+    
+    workbook.save(excel_file)
     
     logger.info(f"📊 Excelファイル作成: {excel_file}")
     
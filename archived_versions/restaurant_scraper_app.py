@@ -13,10 +13,7 @@ import logging
 from datetime import datetime
 from typing import List, Dict
 
-# 自作モジュールのインポート
-from hotpepper_api_client import HotpepperAPIClient
-from tabelog_scraper_improved import TabelogScraperImproved
-from restaurant_data_integrator import RestaurantDataIntegrator
+# 自作モジュール（pandas等の重い依存を含む）は起動を速くするため使用時にインポート
 
 # ログ設定
 logging.basicConfig(
@@ -35,8 +32,8 @@ class RestaurantScraperApp:
     def __init__(self):
         """初期化"""
         self.hotpepper_client = None  # 必要時に初期化
-        self.tabelog_scraper = TabelogScraperImproved()
-        self.data_integrator = RestaurantDataIntegrator()
+        self.tabelog_scraper = None  # 必要時に初期化
+        self.data_integrator = None  # 必要時に初期化
         
     def scrape_restaurants(self, 
                           areas: List[str] = None,
@@ -66,6 +63,7 @@ class RestaurantScraperApp:
         if use_hotpepper and hotpepper_api_key:
             logger.info("🌶️ ホットペッパーからデータ取得開始")
             if not self.hotpepper_client:
+                from hotpepper_api_client import HotpepperAPIClient
                 self.hotpepper_client = HotpepperAPIClient(hotpepper_api_key)
             else:
                 self.hotpepper_client.api_key = hotpepper_api_key
@@ -83,6 +81,9 @@ class RestaurantScraperApp:
         # 食べログからデータ取得
         if use_tabelog:
             logger.info("🍽️ 食べログからデータ取得開始")
+            if not self.tabelog_scraper:
+                from tabelog_scraper_improved import TabelogScraperImproved
+                self.tabelog_scraper = TabelogScraperImproved()
             
             for area in areas:
                 try:
@@ -112,6 +113,10 @@ class RestaurantScraperApp:
         """
         logger.info("📊 データ処理開始")
         
+        if not self.data_integrator:
+            from restaurant_data_integrator import RestaurantDataIntegrator
+            self.data_integrator = RestaurantDataIntegrator()
+        
         # データ統合処理
         self.data_integrator.add_restaurants(restaurants)
         self.data_integrator.validate_data()
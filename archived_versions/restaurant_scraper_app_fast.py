@@ -10,29 +10,98 @@ import sys
 import os
 import argparse
 import asyncio
+import atexit
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional, Iterable, Iterator
 import signal
 import json
+import hashlib
+import functools
+import time
+import re
+import unicodedata
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # 自作モジュールのインポート
 from hotpepper_api_client import HotpepperAPIClient
-from tabelog_scraper_async import TabelogScraperAsync
+from tabelog_scraper_async import TabelogScraperAsync, RateLimiter, create_session
 from restaurant_data_integrator import RestaurantDataIntegrator
 
-# ログ設定
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('restaurant_scraper_fast.log', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
+# ログ設定（ファイル・コンソールへの書き込みはQueueListenerのスレッドで行い、処理中の呼び出しをブロックしない）
+# インポートしたモジュールがbasicConfigを呼んでいるため、ルートロガーのハンドラーを明示的に置き換える
+_log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+_log_handlers = [
+    logging.FileHandler('restaurant_scraper_fast.log', encoding='utf-8'),
+    logging.StreamHandler()
+]
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+
+_log_queue = queue.Queue(-1)
+_log_listener = QueueListener(_log_queue, *_log_handlers)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+_root_logger = logging.getLogger()
+_root_logger.handlers = [QueueHandler(_log_queue)]
+_root_logger.setLevel(logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 地域ごとの取得結果キャッシュ（再実行時は通信せずに再利用）
+AREA_CACHE_DIR = Path("cache/areas")
+AREA_CACHE_TTL = 24 * 60 * 60  # 24時間
+
+# 対象地域（対話モードの選択番号 → 地域名）
+AREA_MAP = {
+    '1': '東京都', '2': '大阪府', '3': '神奈川県',
+    '4': '愛知県', '5': '福岡県', '6': '北海道',
+    '7': '京都府', '8': '兵庫県', '9': '埼玉県',
+    '10': '千葉県'
+}
+AREA_LIST = tuple(AREA_MAP.values())
+
+# 重複判定時に住所から除去する空白
+WHITESPACE_RE = re.compile(r'\s+')
+
+# ホットペッパーAPIの1リクエストあたりの最大取得件数
+HOTPEPPER_PAGE_SIZE = 100
+
+# 出力形式
+OUTPUT_FORMATS = ('xlsx', 'parquet', 'jsonl')
+PARQUET_ROW_GROUP_SIZE = 10000
+
+def _load_json(path):
+    """JSONファイルを読み込む（orjsonがあれば高速にデコード）"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def _dump_json(data, path, indent: bool = True):
+    """JSONファイルに書き込む（orjsonがあれば高速にエンコード）"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=option))
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2 if indent else None)
+
+def _normalize_address(address: str) -> str:
+    """重複判定用に住所を正規化（NFKC変換と空白除去）"""
+    return WHITESPACE_RE.sub('', unicodedata.normalize('NFKC', address))
+
 class RestaurantScraperAppFast:
     """高速版飲食店スクレイピングアプリケーション"""
     
@@ -43,21 +112,14 @@ class RestaurantScraperAppFast:
         self.interrupted = False
         self.progress_data = {}
         
-        # シグナルハンドラーを設定（Ctrl+C対応）
-        signal.signal(signal.SIGINT, self._signal_handler)
-        
-    def _signal_handler(self, signum, frame):
-        """割り込みシグナルハンドラー"""
-        logger.info("\n⚠️ 処理を中断しています... 進捗を保存します")
-        self.interrupted = True
-        
     async def scrape_restaurants_async(self, 
                                      areas: List[str] = None,
                                      max_per_area: int = 100,
                                      use_hotpepper: bool = True,
                                      use_tabelog: bool = True,
                                      hotpepper_api_key: str = None,
-                                     max_concurrent: int = 10) -> List[Dict]:
+                                     max_concurrent: int = 10,
+                                     requests_per_second: float = 2.0) -> List[Dict]:
         """
         非同期で飲食店データを取得
         
@@ -68,127 +130,363 @@ class RestaurantScraperAppFast:
             use_tabelog: 食べログを使用するか
             hotpepper_api_key: ホットペッパーAPIキー
             max_concurrent: 最大同時接続数
+            requests_per_second: サイトごとの1秒あたり最大リクエスト数（0以下で制限なし）
             
         Returns:
             List[Dict]: 飲食店データリスト
         """
-        all_restaurants = []
         start_time = datetime.now()
+        total_count = 0
         
         # デフォルト地域
         if not areas:
             areas = ['東京都']
         
+        # 食べログへの接続はkeep-aliveで実行全体を通して使い回す
+        session = None
+        
         try:
-            # 食べログからデータ取得
+            # 食べログとホットペッパーは独立したホストなので並行して取得
+            tasks = []
             if use_tabelog and not self.interrupted:
-                logger.info("🍽️ 食べログからデータ取得開始（非同期モード）")
-                
-                async with TabelogScraperAsync(max_concurrent=max_concurrent) as scraper:
-                    tabelog_data = await scraper.scrape_restaurants_batch(areas, max_per_area)
-                    all_restaurants.extend(tabelog_data)
-                    
-                    logger.info(f"✅ 食べログから {len(tabelog_data)} 件取得完了")
-                    
-                    # 進捗を保存
-                    self.progress_data['tabelog_completed'] = True
-                    self.progress_data['tabelog_count'] = len(tabelog_data)
-                    self._save_progress()
-            
-            # ホットペッパーからデータ取得
+                session = create_session(max_concurrent * 2)
+                tasks.append(asyncio.ensure_future(self._run_tabelog(
+                    areas, max_per_area, max_concurrent, self._create_rate_limiter(requests_per_second),
+                    session
+                )))
             if use_hotpepper and hotpepper_api_key and not self.interrupted:
-                logger.info("🍽️ ホットペッパーからデータ取得開始")
-                
-                if not self.hotpepper_client:
-                    self.hotpepper_client = HotpepperAPIClient(hotpepper_api_key)
-                
-                for area in areas:
-                    if self.interrupted:
-                        break
-                        
-                    logger.info(f"  {area}のデータ取得中...")
-                    hotpepper_data = self.hotpepper_client.search_restaurants(
-                        keyword=area,
-                        count=max_per_area
-                    )
-                    all_restaurants.extend(hotpepper_data)
-                    logger.info(f"  {area}: {len(hotpepper_data)}件取得")
-                
-                logger.info(f"✅ ホットペッパーから合計 {len(hotpepper_data)} 件取得完了")
-                
-                # 進捗を保存
-                self.progress_data['hotpepper_completed'] = True
-                self._save_progress()
+                tasks.append(asyncio.ensure_future(self._run_hotpepper(
+                    areas, max_per_area, hotpepper_api_key, max_concurrent,
+                    self._create_rate_limiter(requests_per_second)
+                )))
+            
+            # Ctrl+Cで実行中のタスクを即座にキャンセル（各タスクは取得済み分を返して終了）
+            remove_handler = self._install_interrupt_handler(tasks)
+            seen_keys = set()
+            try:
+                # 取得が終わった取得元から順に統合し、残りの取得元の通信と並行させる
+                for next_done in asyncio.as_completed(tasks):
+                    try:
+                        result = await next_done
+                    except asyncio.CancelledError:
+                        continue
+                    except Exception as e:
+                        logger.error(f"データ取得エラー: {e}")
+                        continue
+                    
+                    total_count += len(result)
+                    # 完全一致の重複を除きながら統合モジュールへ直接流し込む
+                    self.data_integrator.add_restaurants_iter(self._pre_deduplicate(result, seen_keys))
+                    del result
+            finally:
+                remove_handler()
             
             # データ統合
-            if all_restaurants and not self.interrupted:
+            if total_count:
                 logger.info("🔄 データ統合処理中...")
-                # データを追加して重複を削除
-                self.data_integrator.add_restaurants(all_restaurants)
+                # 重複を削除
                 self.data_integrator.remove_duplicates()
                 integrated_data = self.data_integrator.restaurants
                 
                 # 統計情報
                 elapsed_time = (datetime.now() - start_time).total_seconds()
                 logger.info(f"\n📊 処理完了統計:")
-                logger.info(f"  総取得件数: {len(all_restaurants)}件")
+                logger.info(f"  総取得件数: {total_count}件")
                 logger.info(f"  統合後件数: {len(integrated_data)}件")
                 logger.info(f"  処理時間: {elapsed_time:.1f}秒")
-                logger.info(f"  処理速度: {len(all_restaurants)/elapsed_time:.1f}件/秒")
+                logger.info(f"  処理速度: {total_count/elapsed_time:.1f}件/秒")
                 
                 return integrated_data
             
-            return all_restaurants
+            return []
             
         except Exception as e:
             logger.error(f"エラーが発生しました: {e}")
+            all_restaurants = self.data_integrator.restaurants
             if all_restaurants:
                 logger.info(f"エラー発生前に {len(all_restaurants)} 件のデータを取得済み")
             return all_restaurants
+        
+        finally:
+            if session:
+                await session.close()
+    
+    def _install_interrupt_handler(self, tasks: List[asyncio.Future]):
+        """
+        Ctrl+Cでタスクをキャンセルするハンドラーを登録
+        
+        Returns:
+            登録したハンドラーを解除する関数
+        """
+        loop = asyncio.get_event_loop()
+        
+        def cancel_all():
+            logger.info("\n⚠️ 処理を中断しています... 進捗を保存します")
+            self.interrupted = True
+            for task in tasks:
+                task.cancel()
+        
+        try:
+            loop.add_signal_handler(signal.SIGINT, cancel_all)
+            return lambda: loop.remove_signal_handler(signal.SIGINT)
+        except NotImplementedError:
+            # Windowsではadd_signal_handlerが使えないため通常のシグナルハンドラーからループに通知
+            previous = signal.signal(signal.SIGINT, lambda signum, frame: loop.call_soon_threadsafe(cancel_all))
+            return lambda: signal.signal(signal.SIGINT, previous)
+    
+    def _pre_deduplicate(self, restaurants: Iterable[Dict], seen: set) -> Iterator[Dict]:
+        """
+        店名と住所（表記ゆれを正規化）が一致するデータを除去しながら順に返す
+        
+        Args:
+            restaurants: 飲食店データ
+            seen: 既出のキー（取得元をまたいで共有する）
+        """
+        for restaurant in restaurants:
+            # 全角・半角の違いと住所中の空白を無視して比較（文字列を連結せずタプルのままハッシュ）
+            key = (sys.intern(unicodedata.normalize('NFKC', restaurant.get('shop_name', '')).strip()),
+                   sys.intern(_normalize_address(restaurant.get('address', ''))))
+            if key != ('', ''):
+                if key in seen:
+                    continue
+                seen.add(key)
+            yield restaurant
+    
+    def _create_rate_limiter(self, requests_per_second: float) -> Optional[RateLimiter]:
+        """サイトごとのレート制限を作成"""
+        if requests_per_second and requests_per_second > 0:
+            return RateLimiter(requests_per_second, burst=max(int(requests_per_second), 1))
+        return None
+    
+    async def _run_tabelog(self, areas: List[str], max_per_area: int, max_concurrent: int,
+                           rate_limiter: Optional[RateLimiter] = None,
+                           session=None) -> List[Dict]:
+        """食べログからデータ取得"""
+        logger.info("🍽️ 食べログからデータ取得開始（非同期モード）")
+        
+        tabelog_data = []
+        async with TabelogScraperAsync(max_concurrent=max_concurrent, rate_limiter=rate_limiter,
+                                       session=session) as scraper:
+            for area in areas:
+                if self.interrupted:
+                    break
+                
+                cached = self._load_area_cache('tabelog', area, max_per_area)
+                if cached is not None:
+                    logger.info(f"  {area}: キャッシュから{len(cached)}件読み込み")
+                    tabelog_data.extend(cached)
+                    continue
+                
+                try:
+                    area_data = await scraper.scrape_restaurants_batch([area], max_per_area)
+                except asyncio.CancelledError:
+                    logger.info(f"  {area}: 中断されました")
+                    break
+                self._save_area_cache('tabelog', area, max_per_area, area_data)
+                tabelog_data.extend(area_data)
+        
+        logger.info(f"✅ 食べログから {len(tabelog_data)} 件取得完了")
+        
+        # 進捗を保存
+        self.progress_data['tabelog_completed'] = not self.interrupted
+        self.progress_data['tabelog_count'] = len(tabelog_data)
+        self._save_progress()
+        
+        return tabelog_data
+    
+    async def _run_hotpepper(self, areas: List[str], max_per_area: int,
+                             hotpepper_api_key: str, max_concurrent: int,
+                             rate_limiter: Optional[RateLimiter] = None) -> List[Dict]:
+        """ホットペッパーからデータ取得"""
+        logger.info("🍽️ ホットペッパーからデータ取得開始")
+        
+        if not self.hotpepper_client:
+            self.hotpepper_client = HotpepperAPIClient(hotpepper_api_key)
+        
+        # API呼び出し（同期処理）をページ単位でスレッドに割り振り、地域・ページをまたいで並行実行
+        loop = asyncio.get_event_loop()
+        semaphore = asyncio.Semaphore(max_concurrent)
+        
+        async def fetch_page(area: str, start: int, count: int) -> Dict:
+            async with semaphore:
+                if self.interrupted:
+                    return {}
+                if rate_limiter:
+                    await rate_limiter.acquire()
+                return await loop.run_in_executor(
+                    None, functools.partial(
+                        self.hotpepper_client.search_shops, keyword=area, count=count, start=start
+                    )
+                )
+        
+        async def fetch_area(area: str) -> List[Dict]:
+            cached = self._load_area_cache('hotpepper', area, max_per_area)
+            if cached is not None:
+                logger.info(f"  {area}: キャッシュから読み込み")
+                return cached
+            
+            logger.info(f"  {area}のデータ取得中...")
+            
+            # 1ページ目で総件数を確認し、残りのページはまとめて取得
+            first = (await fetch_page(area, 1, min(HOTPEPPER_PAGE_SIZE, max_per_area))).get('results', {})
+            shops = list(first.get('shop', []))
+            available = min(int(first.get('results_available') or 0), max_per_area)
+            
+            starts = range(1 + HOTPEPPER_PAGE_SIZE, available + 1, HOTPEPPER_PAGE_SIZE)
+            pages = await asyncio.gather(*(
+                fetch_page(area, start, min(HOTPEPPER_PAGE_SIZE, available - start + 1))
+                for start in starts
+            ))
+            for page in pages:
+                shops.extend(page.get('results', {}).get('shop', []))
+            
+            area_data = self.hotpepper_client.extract_shop_info(shops[:max_per_area])
+            if not self.interrupted:
+                self._save_area_cache('hotpepper', area, max_per_area, area_data)
+            return area_data
+        
+        # 地域ごとに完了した分を集める（中断時も完了済みの地域は残す）
+        hotpepper_data = []
+        
+        async def collect_area(area: str):
+            try:
+                area_data = await fetch_area(area)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"  {area}: 取得エラー {e}")
+                return
+            hotpepper_data.extend(area_data)
+            logger.info(f"  {area}: {len(area_data)}件取得")
+        
+        try:
+            await asyncio.gather(*(collect_area(area) for area in areas))
+        except asyncio.CancelledError:
+            logger.info("  ホットペッパー: 中断されました")
+        
+        logger.info(f"✅ ホットペッパーから合計 {len(hotpepper_data)} 件取得完了")
+        
+        # 進捗を保存
+        self.progress_data['hotpepper_completed'] = not self.interrupted
+        self._save_progress()
+        
+        return hotpepper_data
+    
+    def _area_cache_path(self, source: str, area: str, max_per_area: int) -> Path:
+        """地域キャッシュのファイルパス"""
+        key = hashlib.md5(f"{area}|{max_per_area}".encode('utf-8')).hexdigest()
+        return AREA_CACHE_DIR / f"{source}_{key}.json"
+    
+    def _load_area_cache(self, source: str, area: str, max_per_area: int) -> Optional[List[Dict]]:
+        """有効期限内の地域キャッシュを読み込む"""
+        cache_path = self._area_cache_path(source, area, max_per_area)
+        try:
+            if time.time() - cache_path.stat().st_mtime > AREA_CACHE_TTL:
+                return None
+            return _load_json(cache_path)
+        except (OSError, ValueError):
+            return None
+    
+    def _save_area_cache(self, source: str, area: str, max_per_area: int, data: List[Dict]):
+        """地域キャッシュを保存（一時ファイル経由で置き換え）"""
+        if not data:
+            return
+        
+        cache_path = self._area_cache_path(source, area, max_per_area)
+        tmp_path = cache_path.with_suffix('.tmp')
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            _dump_json(data, tmp_path, indent=False)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"地域キャッシュ保存エラー {area}: {e}")
     
     def _save_progress(self):
         """進捗を保存"""
         progress_file = Path("cache/app_progress.json")
         progress_file.parent.mkdir(exist_ok=True)
         
-        with open(progress_file, 'w', encoding='utf-8') as f:
-            json.dump(self.progress_data, f, ensure_ascii=False, indent=2)
+        _dump_json(self.progress_data, progress_file)
     
-    def save_to_excel_with_progress(self, restaurants: List[Dict], output_file: str = None):
+    def save_to_excel_with_progress(self, restaurants: List[Dict], output_file: str = None,
+                                    output_format: str = None):
         """
-        進捗を表示しながらExcelファイルに保存
+        進捗を表示しながらファイルに保存
+        
+        Args:
+            restaurants: 飲食店データリスト
+            output_file: 出力ファイル名
+            output_format: 出力形式（xlsx / parquet / jsonl、省略時は拡張子から判定）
         """
         if not restaurants:
             logger.warning("保存するデータがありません")
             return
         
+        # 出力形式（指定がなければファイル名の拡張子、それもなければExcel）
+        if not output_format:
+            suffix = Path(output_file).suffix.lower().lstrip('.') if output_file else ''
+            output_format = suffix if suffix in OUTPUT_FORMATS else 'xlsx'
+        
         # デフォルトファイル名
         if not output_file:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            output_file = f'restaurant_list_{timestamp}.xlsx'
+            output_file = f'restaurant_list_{timestamp}.{output_format}'
+        elif Path(output_file).suffix.lower() != f'.{output_format}':
+            output_file = str(Path(output_file).with_suffix(f'.{output_format}'))
         
         # outputディレクトリに保存
         output_path = Path("output") / output_file
         output_path.parent.mkdir(exist_ok=True)
         
         try:
-            logger.info(f"📝 Excelファイル作成中: {output_path}")
+            logger.info(f"📝 {output_format}ファイル作成中: {output_path}")
             
-            # データ統合モジュールのExcel出力機能を使用
-            self.data_integrator.restaurants = restaurants
-            self.data_integrator.create_excel_report(str(output_path))
+            if output_format == 'jsonl':
+                self._write_jsonl(restaurants, output_path)
+            elif output_format == 'parquet':
+                self._write_parquet(restaurants, output_path)
+            else:
+                # データ統合モジュールのExcel出力機能を使用（行単位でストリーム出力）
+                self.data_integrator.create_excel_report(str(output_path), restaurants)
             
-            logger.info(f"✅ Excelファイル保存完了: {output_path}")
+            logger.info(f"✅ ファイル保存完了: {output_path}")
             logger.info(f"   ファイルサイズ: {output_path.stat().st_size / 1024:.1f} KB")
             
         except Exception as e:
-            logger.error(f"Excel保存エラー: {e}")
+            logger.error(f"ファイル保存エラー: {e}")
             # 緊急バックアップとしてJSONで保存
             backup_file = output_path.with_suffix('.json')
-            with open(backup_file, 'w', encoding='utf-8') as f:
-                json.dump(restaurants, f, ensure_ascii=False, indent=2)
+            _dump_json(restaurants, backup_file)
             logger.info(f"📄 バックアップファイル保存: {backup_file}")
     
+    def _write_jsonl(self, restaurants: List[Dict], output_path: Path):
+        """1行1件のJSON Linesで書き出す"""
+        with open(output_path, 'wb') as f:
+            for restaurant in restaurants:
+                if orjson is not None:
+                    f.write(orjson.dumps(restaurant))
+                else:
+                    f.write(json.dumps(restaurant, ensure_ascii=False).encode('utf-8'))
+                f.write(b'\n')
+    
+    def _write_parquet(self, restaurants: List[Dict], output_path: Path):
+        """行グループ単位でParquetに書き出す（pyarrowが必要）"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        # 全データのキーを出現順に集めて列とする（値はすべて文字列として保存）
+        columns = list(dict.fromkeys(key for restaurant in restaurants for key in restaurant))
+        schema = pa.schema([(column, pa.string()) for column in columns])
+        
+        with pq.ParquetWriter(str(output_path), schema, compression='zstd') as writer:
+            for i in range(0, len(restaurants), PARQUET_ROW_GROUP_SIZE):
+                chunk = restaurants[i:i + PARQUET_ROW_GROUP_SIZE]
+                table = pa.Table.from_pydict({
+                    column: [None if r.get(column) is None else str(r.get(column)) for r in chunk]
+                    for column in columns
+                }, schema=schema)
+                writer.write_table(table)
+    
     def run_interactive_mode(self):
         """対話モードで実行"""
         print("\n🍽️ 飲食店営業リスト作成アプリ（高速版）")
@@ -196,37 +494,24 @@ class RestaurantScraperAppFast:
         
         # 地域選択
         print("\n対象地域を選択してください（複数選択可）:")
-        print("1. 東京都")
-        print("2. 大阪府")
-        print("3. 神奈川県")
-        print("4. 愛知県")
-        print("5. 福岡県")
-        print("6. 北海道")
-        print("7. 京都府")
-        print("8. 兵庫県")
-        print("9. 埼玉県")
-        print("10. 千葉県")
-        
-        area_map = {
-            '1': '東京都', '2': '大阪府', '3': '神奈川県',
-            '4': '愛知県', '5': '福岡県', '6': '北海道',
-            '7': '京都府', '8': '兵庫県', '9': '埼玉県',
-            '10': '千葉県'
-        }
+        for num, area in AREA_MAP.items():
+            print(f"{num}. {area}")
         
         selected_areas = []
+        selected_set = set()
         while True:
             choice = input("\n番号を入力（複数の場合はカンマ区切り、終了はEnter）: ").strip()
             if not choice:
                 break
-                
-            for num in choice.split(','):
-                num = num.strip()
-                if num in area_map:
-                    area = area_map[num]
-                    if area not in selected_areas:
-                        selected_areas.append(area)
-                        print(f"  ✓ {area}を追加")
+            
+            nums = [num.strip() for num in choice.split(',')]
+            new_areas = list(dict.fromkeys(
+                AREA_MAP[num] for num in nums if num in AREA_MAP and AREA_MAP[num] not in selected_set
+            ))
+            selected_areas.extend(new_areas)
+            selected_set.update(new_areas)
+            for area in new_areas:
+                print(f"  ✓ {area}を追加")
         
         if not selected_areas:
             selected_areas = ['東京都']
@@ -306,6 +591,13 @@ class RestaurantScraperAppFast:
 
 def main():
     """メイン関数"""
+    # uvloopがあれば高速なイベントループを使用（Windowsなど未対応の環境では標準のまま）
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    
     parser = argparse.ArgumentParser(
         description='高速版飲食店営業リスト作成アプリ',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -319,19 +611,30 @@ def main():
   
   # 複数地域から取得
   python restaurant_scraper_app_fast.py --areas 東京都 大阪府 神奈川県 --max-per-area 500
+  
+  # 大量データをJSON Linesで出力
+  python restaurant_scraper_app_fast.py --areas 東京都 --max-per-area 5000 --format jsonl
         """
     )
     
     parser.add_argument('--areas', nargs='+', help='対象地域 (例: --areas 東京都 大阪府)')
     parser.add_argument('--max-per-area', type=int, default=100, help='地域あたりの最大取得件数')
     parser.add_argument('--output', '-o', help='出力ファイル名')
+    parser.add_argument('--format', choices=OUTPUT_FORMATS,
+                        help='出力形式（省略時は出力ファイル名の拡張子、なければxlsx）')
     parser.add_argument('--hotpepper-key', help='ホットペッパーAPIキー')
     parser.add_argument('--no-tabelog', action='store_true', help='食べログを使用しない')
     parser.add_argument('--concurrent', type=int, default=10, help='最大同時接続数（1-50）')
+    parser.add_argument('--rps', type=float, default=2.0, help='サイトごとの1秒あたり最大リクエスト数（0で制限なし）')
     parser.add_argument('--interactive', '-i', action='store_true', help='対話モードで実行')
     
     args = parser.parse_args()
     
+    # 未対応の地域はイベントループを起動する前にエラーにする
+    unknown_areas = [area for area in (args.areas or []) if area not in AREA_LIST]
+    if unknown_areas:
+        parser.error(f"未対応の地域: {', '.join(unknown_areas)}（対応地域: {', '.join(AREA_LIST)}）")
+    
     # アプリケーション実行
     app = RestaurantScraperAppFast()
     
@@ -343,15 +646,16 @@ def main():
             app.scrape_restaurants_async(
                 areas=args.areas,
                 max_per_area=args.max_per_area,
-                use_hotpepper=not args.no_tabelog,
+                use_hotpepper=bool(args.hotpepper_key),
                 use_tabelog=not args.no_tabelog,
                 hotpepper_api_key=args.hotpepper_key,
-                max_concurrent=min(max(args.concurrent, 1), 50)
+                max_concurrent=min(max(args.concurrent, 1), 50),
+                requests_per_second=args.rps
             )
         )
         
         if restaurants:
-            app.save_to_excel_with_progress(restaurants, args.output)
+            app.save_to_excel_with_progress(restaurants, args.output, args.format)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -25,22 +25,75 @@ from pathlib import Path
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def create_session(limit: int, force_close: bool = False) -> aiohttp.ClientSession:
+    """
+    食べログ用のHTTPセッションを作成
+    
+    Args:
+        limit: 最大同時接続数
+        force_close: Trueの場合はリクエストごとに接続を閉じる（keep-aliveしない）
+    """
+    timeout = ClientTimeout(total=30, connect=10, sock_read=10)
+    connector = TCPConnector(limit=limit, force_close=force_close)
+    return aiohttp.ClientSession(
+        timeout=timeout,
+        connector=connector,
+        headers={
+            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+        }
+    )
+
+class RateLimiter:
+    """トークンバケット方式のレート制限（1秒あたりのリクエスト数を制御）"""
+    
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        初期化
+        
+        Args:
+            rate: 1秒あたりの最大リクエスト数
+            burst: 一度に消費できる最大トークン数
+        """
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+    
+    async def acquire(self):
+        """トークンを1つ取得（不足している場合は補充されるまで待機）"""
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
 class TabelogScraperAsync:
     """非同期版食べログスクレイパー"""
     
-    def __init__(self, max_concurrent: int = 10, delay_range: tuple = (0.5, 1.0)):
+    def __init__(self, max_concurrent: int = 10, delay_range: tuple = (0.5, 1.0),
+                 rate_limiter: Optional[RateLimiter] = None,
+                 session: Optional[aiohttp.ClientSession] = None):
         """
         初期化
         
         Args:
             max_concurrent: 最大同時接続数
             delay_range: リクエスト間の遅延範囲（秒）
+            rate_limiter: リクエストレート制限（Noneの場合は制限なし）
+            session: 共有するHTTPセッション（指定時は作成・クローズを呼び出し側に任せる）
         """
         self.max_concurrent = max_concurrent
         self.delay_range = delay_range
+        self.rate_limiter = rate_limiter
         self.base_url = "https://tabelog.com"
         self.semaphore = asyncio.Semaphore(max_concurrent)
-        self.session = None
+        self.session = session
+        self.owns_session = session is None
         self.progress_file = Path("cache/scraping_progress.json")
         self.results_file = Path("cache/partial_results.json")
         self.processed_urls: Set[str] = set()
@@ -48,22 +101,15 @@ class TabelogScraperAsync:
         
     async def __aenter__(self):
         """非同期コンテキストマネージャーの開始"""
-        timeout = ClientTimeout(total=30, connect=10, sock_read=10)
-        connector = TCPConnector(limit=self.max_concurrent, force_close=True)
-        self.session = aiohttp.ClientSession(
-            timeout=timeout,
-            connector=connector,
-            headers={
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-            }
-        )
+        if self.owns_session:
+            self.session = create_session(self.max_concurrent, force_close=True)
         # 進捗を読み込む
         self._load_progress()
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """非同期コンテキストマネージャーの終了"""
-        if self.session:
+        if self.session and self.owns_session:
             await self.session.close()
             
     def _load_progress(self):
@@ -124,6 +170,9 @@ class TabelogScraperAsync:
                 delay = random.uniform(*self.delay_range)
                 await asyncio.sleep(delay)
                 
+                if self.rate_limiter:
+                    await self.rate_limiter.acquire()
+                
                 async with self.session.get(url) as response:
                     if response.status == 200:
                         return await response.text()
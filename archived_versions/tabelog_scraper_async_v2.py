@@ -10,6 +10,7 @@ import asyncio
 import aiohttp
 from aiohttp import ClientTimeout, TCPConnector
 from bs4 import BeautifulSoup
+import soupsieve
 import time
 import re
 from typing import List, Dict, Optional, Set
@@ -20,36 +21,240 @@ from datetime import datetime
 import json
 import os
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from tabelog_scraper_async import RateLimiter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # ログ設定
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# HTMLパーサー（C実装のlxmlが使えればそちらを使う）
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# 再試行の設定（429や5xxは指数バックオフで再試行する）
+MAX_RETRIES = 3
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# 店舗ページの情報テーブルで値を拾うラベル（th/td）
+DETAIL_LABELS = ('住所', '電話番号', 'ジャンル', '営業時間', '交通手段', '最寄り駅')
+
+# 抽出用の正規表現（店舗ごと・項目ごとに使うのでモジュール読み込み時にコンパイル）
+RESTAURANT_LINK_RE = re.compile(r'/[^/]+/A\d+/A\d+/\d+/')
+READING_PAREN_RE = re.compile(r'\s*\([^)]+\)\s*$')
+WHITESPACE_RE = re.compile(r'\s+')
+ZIP_CODE_RE = re.compile(r'〒\d{3}-\d{4}\s*')
+ADDRESS_LABEL_RE = re.compile(r'^\s*住所\s*[:：]\s*')
+# 電話番号のパターンは1つの選択（|）にまとめ、テキストを1回の走査で検索する
+PHONE_RE = re.compile(
+    r'03-\d{4}-\d{4}'
+    r'|0\d{2,3}-\d{3,4}-\d{4}'
+    r'|0\d{9,10}'
+    r'|\d{2,4}-\d{2,4}-\d{4}'
+)
+# 地図ページではページ全体を検索するため、桁区切りだけの緩いパターンは使わない
+MAP_PHONE_RE = re.compile(
+    r'03-\d{4}-\d{4}'
+    r'|0\d{2,3}-\d{3,4}-\d{4}'
+    r'|0\d{9,10}'
+)
+# 地図ページの生HTMLからテキスト部分だけを残すためのもの（script/styleの中身とタグを除去）
+SCRIPT_STYLE_RE = re.compile(r'<(script|style)\b.*?</\1>', re.S | re.I)
+TAG_RE = re.compile(r'<[^>]+>')
+# 構造化データ（schema.org のJSON-LD）のscriptタグ
+LDJSON_RE = re.compile(r'<script[^>]*type="application/ld\+json"[^>]*>(.*?)</script>', re.S)
+# 店舗ページで必要な項目がある範囲（ヘッダーから店舗情報テーブルまで）の開始位置
+RDHEADER_RE = re.compile(r'<div[^>]*\bid="rdheader"')
+
+def _slice_detail_html(html: str) -> str:
+    """
+    店舗ページのHTMLからヘッダー〜店舗情報テーブル（rstinfo-table）の範囲だけを切り出す
+    
+    口コミ・写真・スクリプトなどを解析対象から外すため。範囲が見つからない場合は全体を返す
+    """
+    match = RDHEADER_RE.search(html)
+    if not match:
+        return html
+    table = html.find('rstinfo-table', match.start())
+    if table < 0:
+        return html
+    end = html.find('</table>', table)
+    if end < 0:
+        return html
+    return html[match.start():end + len('</table>')]
+
+def _loads(raw):
+    """JSONをデコード（orjsonがあれば高速にデコード）"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def _dumps(data, indent: bool = False) -> bytes:
+    """JSONをUTF-8のバイト列にエンコード（orjsonがあれば高速にエンコード）"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(data, ensure_ascii=False, indent=2 if indent else None).encode('utf-8')
+
+class RankedSelector:
+    """
+    優先順位付きのCSSセレクタ群を、まとめた1つのセレクタ（A, B, ...）で1回だけ走査して評価する
+    
+    一致した要素は個別のセレクタに振り分けるので、呼び出し側は従来どおり優先順に結果を参照できる。
+    'th:contains("ラベル") + td' 形式はラベルセルの一括走査で扱うため、ここでは対象外
+    """
+    
+    def __init__(self, selectors):
+        self.patterns = [
+            (selector, soupsieve.compile(selector))
+            for selector in selectors if not selector.startswith('th:contains(')
+        ]
+        self.union = soupsieve.compile(', '.join(s for s, _ in self.patterns)) if self.patterns else None
+    
+    def select(self, soup: BeautifulSoup) -> Dict[str, List]:
+        """セレクタごとに一致した要素のリスト（文書順）を返す"""
+        matches = {}
+        if self.union is None:
+            return matches
+        for elem in self.union.select(soup):
+            for selector, pattern in self.patterns:
+                if pattern.match(elem):
+                    matches.setdefault(selector, []).append(elem)
+        return matches
+
 class TabelogScraperAsyncV2:
     """非同期版食べログスクレイパー V2"""
     
-    def __init__(self, max_concurrent: int = 10, delay_range: tuple = (0.5, 1.0)):
+    # 抽出に使うセレクタ（優先順位の高い順。呼び出しごとにリストを作らないようクラス定数にする）
+    # 一覧ページの店舗リンク
+    LINK_SELECTORS = (
+        'a.list-rst__rst-name-target',
+        'a.js-restaurant-link',
+        'h3.list-rst__rst-name a',
+        'div.list-rst__rst-name a',
+        'a[href*="/A"][href*="/A"][href*="/"]'
+    )
+    # 店名
+    SHOP_NAME_SELECTORS = (
+        'h2.display-name span',
+        'h2.display-name',
+        'h1.display-name span',
+        'h1.display-name',
+        'div.rdheader-info__name span',
+        'div.rdheader-info__name',
+        '.rstinfo-table__name',
+        'h1',
+        'title'
+    )
+    # 住所
+    ADDRESS_SELECTORS = (
+        'p.rstinfo-table__address',
+        'span.rstinfo-table__address',
+        'th:contains("住所") + td',
+        'div.rstinfo-table__address',
+        'p.rstdtl-side-address__text',
+        '.rdheader-subinfo__item-text'
+    )
+    # 電話番号
+    PHONE_SELECTORS = (
+        'span.rstinfo-table__tel-num',
+        'p.rstinfo-table__tel',
+        'th:contains("電話番号") + td',
+        'div.rstinfo-table__tel',
+        '.rdheader-subinfo__item--tel'
+    )
+    # ジャンル（明確にラベルされているもの）
+    GENRE_PRIORITY_SELECTORS = (
+        'th:contains("ジャンル") + td',
+        '.rstinfo-table__genre',
+        'span[property="v:category"]'
+    )
+    # ジャンル（一般的なもの。駅名を除外して使う）
+    GENRE_GENERAL_SELECTORS = (
+        'span.linktree__parent-target-text',
+        'div.rdheader-subinfo__item-text'
+    )
+    # 最寄り駅
+    STATION_SELECTORS = (
+        'span.linktree__parent-target-text:contains("駅")',
+        'th:contains("交通手段") + td',
+        'th:contains("最寄り駅") + td',
+        '.rstinfo-table__access',
+        'dl.rdheader-subinfo__item--station'
+    )
+    # 営業時間
+    OPEN_TIME_SELECTORS = (
+        'th:contains("営業時間") + td',
+        'p.rstinfo-table__open-hours',
+        '.rstinfo-table__open-hours',
+        'dl.rdheader-subinfo__item--open-hours'
+    )
+    # 一般的な料理ジャンルのキーワード
+    GENRE_KEYWORDS = (
+        '料理', '焼', '鍋', '寿司', '鮨', 'そば', 'うどん', 'ラーメン',
+        'カレー', 'イタリアン', 'フレンチ', '中華', '和食', '洋食', 'カフェ', 'バー',
+        '居酒屋', '食堂', 'レストラン', '肉', '魚', '野菜', '串', '天ぷら',
+        '丼', '定食'
+    )
+    # 各項目のセレクタを1回の走査で評価するためのもの
+    LINK_MATCHER = RankedSelector(LINK_SELECTORS)
+    SHOP_NAME_MATCHER = RankedSelector(SHOP_NAME_SELECTORS)
+    ADDRESS_MATCHER = RankedSelector(ADDRESS_SELECTORS)
+    PHONE_MATCHER = RankedSelector(PHONE_SELECTORS)
+    GENRE_MATCHER = RankedSelector(GENRE_PRIORITY_SELECTORS + GENRE_GENERAL_SELECTORS)
+    STATION_MATCHER = RankedSelector(STATION_SELECTORS)
+    OPEN_TIME_MATCHER = RankedSelector(OPEN_TIME_SELECTORS)
+    
+    def __init__(self, max_concurrent: int = 10, delay_range: tuple = (0.5, 1.0),
+                 requests_per_second: Optional[float] = None):
         """
         初期化
         
         Args:
             max_concurrent: 最大同時接続数
             delay_range: リクエスト間の遅延範囲（秒）
+            requests_per_second: 全体での1秒あたりの最大リクエスト数
+                （Noneの場合は従来の遅延と同程度になるよう max_concurrent / 平均遅延 とする）
         """
         self.max_concurrent = max_concurrent
         self.delay_range = delay_range
+        if requests_per_second is None:
+            requests_per_second = max_concurrent / max(sum(delay_range) / 2, 0.01)
+        self.rate_limiter = RateLimiter(requests_per_second)
         self.base_url = "https://tabelog.com"
         self.semaphore = asyncio.Semaphore(max_concurrent)
         self.session = None
         self.progress_file = Path("cache/scraping_progress_v2.json")
         self.results_file = Path("cache/partial_results_v2.json")
+        # 取得結果は1件1行のJSONLに追記する（全件の書き直しをしない）
+        self.results_log_file = Path("cache/partial_results_v2.jsonl")
         self.processed_urls: Set[str] = set()
         self.results: List[Dict] = []
+        self._results_log = None
+        # HTML解析用のスレッドプール（解析中もイベントループが通信を続けられるように）
+        self._parse_pool = None
+        # 取得時刻の文字列（秒が変わったときだけ作り直す）
+        self._scraped_at_second = None
+        self._scraped_at_text = ''
         
     async def __aenter__(self):
         """非同期コンテキストマネージャーの開始"""
         timeout = ClientTimeout(total=30, connect=10, sock_read=10)
-        connector = TCPConnector(limit=self.max_concurrent, force_close=True)
+        # 接続先は食べログのみなので、keep-aliveで接続（TLSセッション）を使い回す
+        connector = TCPConnector(
+            limit=self.max_concurrent,
+            limit_per_host=self.max_concurrent,
+            ttl_dns_cache=300,
+            keepalive_timeout=30
+        )
         self.session = aiohttp.ClientSession(
             timeout=timeout,
             connector=connector,
@@ -63,50 +268,105 @@ class TabelogScraperAsyncV2:
                 'Upgrade-Insecure-Requests': '1'
             }
         )
+        self._parse_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1)
         # 進捗を読み込む
         self._load_progress()
+        self._open_results_log()
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """非同期コンテキストマネージャーの終了"""
         if self.session:
             await self.session.close()
+        if self._parse_pool:
+            self._parse_pool.shutdown(wait=True)
+            self._parse_pool = None
+        if self._results_log:
+            self._results_log.close()
+            self._results_log = None
+        # 既存の集計スクリプト向けにJSON形式の結果も最後に1回だけ書き出す
+        self._save_results_snapshot()
             
     def _load_progress(self):
-        """前回の進捗を読み込む"""
-        if self.progress_file.exists():
+        """前回の進捗を読み込む（JSONLがなければ旧形式のJSONから読み込む）"""
+        if self.results_log_file.exists():
             try:
-                with open(self.progress_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.processed_urls = set(data.get('processed_urls', []))
-                    logger.info(f"前回の進捗を読み込みました: {len(self.processed_urls)}件処理済み")
+                with open(self.results_log_file, 'rb') as f:
+                    for line in f:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        try:
+                            self.results.append(_loads(line))
+                        except json.JSONDecodeError:
+                            # 書き込み途中で中断された最終行は読み飛ばす
+                            logger.warning("進捗ログの不完全な行をスキップしました")
             except Exception as e:
-                logger.error(f"進捗読み込みエラー: {e}")
-                
-        if self.results_file.exists():
+                logger.error(f"結果読み込みエラー: {e}")
+        elif self.results_file.exists():
             try:
-                with open(self.results_file, 'r', encoding='utf-8') as f:
-                    self.results = json.load(f)
-                    logger.info(f"前回の結果を読み込みました: {len(self.results)}件")
+                with open(self.results_file, 'rb') as f:
+                    self.results = _loads(f.read())
             except Exception as e:
                 logger.error(f"結果読み込みエラー: {e}")
+        
+        self.processed_urls = {r['url'] for r in self.results if r.get('url')}
+        if self.results:
+            logger.info(f"前回の結果を読み込みました: {len(self.results)}件")
+    
+    def _open_results_log(self):
+        """結果のJSONLを追記モードで開く（旧形式から移行する場合は既存結果を書き込む）"""
+        self.results_log_file.parent.mkdir(exist_ok=True)
+        is_new = not self.results_log_file.exists()
+        self._results_log = open(self.results_log_file, 'ab')
+        # 前回が書き込み途中で中断していた場合、次の行と連結しないよう改行を補う
+        if not is_new and self._results_log.tell() > 0:
+            with open(self.results_log_file, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    self._results_log.write(b'\n')
+        if is_new and self.results:
+            for restaurant_info in self.results:
+                self._results_log.write(_dumps(restaurant_info) + b'\n')
+            self._results_log.flush()
     
-    def _save_progress(self):
-        """進捗を保存"""
+    def _append_result(self, restaurant_info: Dict):
+        """1件分の結果をJSONLに追記"""
+        if not self._results_log:
+            return
+        try:
+            self._results_log.write(_dumps(restaurant_info) + b'\n')
+            self._results_log.flush()
+        except Exception as e:
+            logger.error(f"結果追記エラー: {e}")
+    
+    def _write_checkpoint(self):
+        """進捗（件数と時刻のみ）を一時ファイル経由でアトミックに保存"""
         try:
             self.progress_file.parent.mkdir(exist_ok=True)
-            with open(self.progress_file, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'processed_urls': list(self.processed_urls),
+            tmp_file = self.progress_file.with_suffix('.json.tmp')
+            with open(tmp_file, 'wb') as f:
+                f.write(_dumps({
+                    'total_processed': len(self.processed_urls),
                     'timestamp': datetime.now().isoformat()
-                }, f, ensure_ascii=False, indent=2)
-                
-            with open(self.results_file, 'w', encoding='utf-8') as f:
-                json.dump(self.results, f, ensure_ascii=False, indent=2)
-                
+                }, indent=True))
+            os.replace(tmp_file, self.progress_file)
         except Exception as e:
             logger.error(f"進捗保存エラー: {e}")
     
+    def _save_results_snapshot(self):
+        """結果全体をJSONとして保存（終了時のみ）"""
+        if not self.results:
+            return
+        try:
+            self.results_file.parent.mkdir(exist_ok=True)
+            tmp_file = self.results_file.with_suffix('.json.tmp')
+            with open(tmp_file, 'wb') as f:
+                f.write(_dumps(self.results, indent=True))
+            os.replace(tmp_file, self.results_file)
+        except Exception as e:
+            logger.error(f"結果保存エラー: {e}")
+    
     def get_area_urls(self) -> Dict[str, str]:
         """地域別URLを取得"""
         return {
@@ -122,33 +382,100 @@ class TabelogScraperAsyncV2:
             '千葉県': 'https://tabelog.com/chiba/'
         }
     
-    async def fetch_page(self, url: str) -> Optional[str]:
-        """ページを非同期で取得"""
-        async with self.semaphore:
-            try:
-                # ランダムな遅延
-                delay = random.uniform(*self.delay_range)
-                await asyncio.sleep(delay)
-                
-                async with self.session.get(url) as response:
-                    if response.status == 200:
-                        return await response.text()
-                    else:
-                        logger.warning(f"HTTPエラー {response.status}: {url}")
-                        return None
-                        
-            except asyncio.TimeoutError:
-                logger.error(f"タイムアウト: {url}")
-                return None
-            except Exception as e:
-                logger.error(f"取得エラー {url}: {e}")
+    async def fetch_page(self, url: str, stop_at_info_table: bool = False) -> Optional[str]:
+        """
+        ページを非同期で取得（429・5xx・タイムアウトは指数バックオフで再試行）
+        
+        Args:
+            url: 取得するURL
+            stop_at_info_table: Trueの場合、店舗情報テーブルの終わりまでだけを返す（残りは読み捨てる）
+        """
+        for attempt in range(MAX_RETRIES + 1):
+            status = None
+            retry_after = None
+            async with self.semaphore:
+                # 全体のリクエストレートはトークンバケットで制御
+                await self.rate_limiter.acquire()
+                try:
+                    async with self.session.get(url) as response:
+                        if response.status == 200:
+                            if stop_at_info_table:
+                                return await self._read_until_info_table(response)
+                            return await response.text()
+                        status = response.status
+                        retry_after = response.headers.get('Retry-After')
+                            
+                except asyncio.TimeoutError:
+                    logger.error(f"タイムアウト: {url}")
+                except Exception as e:
+                    logger.error(f"取得エラー {url}: {e}")
+                    return None
+            
+            if (status is not None and status not in RETRY_STATUSES) or attempt == MAX_RETRIES:
+                if status is not None:
+                    logger.warning(f"HTTPエラー {status}: {url}")
                 return None
+            
+            # 待機中は同時接続枠を占有しない
+            wait = self._retry_delay(attempt, retry_after)
+            logger.warning(f"再試行します（{attempt + 1}/{MAX_RETRIES}、{wait:.1f}秒後）: {url}")
+            await asyncio.sleep(wait)
+        
+        return None
+    
+    def _scraped_at(self) -> str:
+        """取得時刻（秒単位のISO形式）を返す。同じ秒の間は同じ文字列を使い回す"""
+        second = int(time.time())
+        if second != self._scraped_at_second:
+            self._scraped_at_second = second
+            self._scraped_at_text = datetime.now().isoformat(timespec='seconds')
+        return self._scraped_at_text
+    
+    async def _read_until_info_table(self, response: aiohttp.ClientResponse) -> str:
+        """
+        店舗ページ本文のうち、rdheader以降の最初のrstinfo-tableの</table>までを返す
+        
+        必要な項目はページ前半にあるため、口コミ等の残りはデコード・解析しない。
+        ただし残りも受信はする（読み残すとaiohttpが接続を閉じ、keep-aliveで使い回せなくなるため）。
+        区切りが見つからなければ全体を返す
+        """
+        buf = bytearray()
+        header_pos = table_pos = -1
+        async for chunk in response.content.iter_chunked(16384):
+            # チャンクの境界をまたぐ一致も見つけられるよう、少し手前から検索する
+            search_from = max(len(buf) - 16, 0)
+            buf += chunk
+            if header_pos < 0:
+                header_pos = buf.find(b'id="rdheader"', search_from)
+                if header_pos < 0:
+                    continue
+                search_from = header_pos
+            if table_pos < 0:
+                table_pos = buf.find(b'rstinfo-table', max(search_from, header_pos))
+                if table_pos < 0:
+                    continue
+                search_from = table_pos
+            if buf.find(b'</table>', max(search_from, table_pos)) >= 0:
+                # 残りは読み捨てて接続をプールに戻す
+                await response.content.read()
+                break
+        return bytes(buf).decode(response.charset or 'utf-8', errors='replace')
+    
+    def _retry_delay(self, attempt: int, retry_after: Optional[str]) -> float:
+        """再試行までの待機秒数（Retry-Afterがあればそれを優先）"""
+        if retry_after:
+            try:
+                return max(float(retry_after), 0.0)
+            except ValueError:
+                pass
+        return 2 ** attempt + random.random()
     
     async def scrape_restaurant_list_async(self, area_url: str, max_pages: int = 5) -> List[str]:
         """
         レストランリストページから個別店舗URLを非同期で取得
         """
         restaurant_urls = []
+        seen_urls: Set[str] = set()
         tasks = []
         
         # ページURLを生成
@@ -166,12 +493,19 @@ class TabelogScraperAsyncV2:
         # 各ページから店舗URLを抽出
         for i, html in enumerate(pages):
             if html:
-                soup = BeautifulSoup(html, 'html.parser')
+                soup = BeautifulSoup(html, HTML_PARSER)
                 links = self._extract_restaurant_links(soup)
                 
                 for href in links:
-                    full_url = urljoin(self.base_url, href)
-                    if full_url not in restaurant_urls:
+                    # 食べログのリンクは絶対URLかルートからのパスなので、urljoinは他の形式のときだけ使う
+                    if href.startswith(('https://', 'http://')):
+                        full_url = href
+                    elif href.startswith('/') and not href.startswith('//'):
+                        full_url = self.base_url + href
+                    else:
+                        full_url = urljoin(self.base_url, href)
+                    if full_url not in seen_urls:
+                        seen_urls.add(full_url)
                         restaurant_urls.append(full_url)
                 
                 logger.info(f"ページ {i+1}: {len(links)}件の店舗URL取得")
@@ -184,16 +518,9 @@ class TabelogScraperAsyncV2:
         links = []
         
         # 複数のセレクタパターンを試す
-        selectors = [
-            'a.list-rst__rst-name-target',
-            'a.js-restaurant-link',
-            'h3.list-rst__rst-name a',
-            'div.list-rst__rst-name a',
-            'a[href*="/A"][href*="/A"][href*="/"]'
-        ]
-        
-        for selector in selectors:
-            elements = soup.select(selector)
+        matches = self.LINK_MATCHER.select(soup)
+        for selector in self.LINK_SELECTORS:
+            elements = matches.get(selector)
             if elements:
                 links = [elem.get('href') for elem in elements if elem.get('href')]
                 break
@@ -202,49 +529,50 @@ class TabelogScraperAsyncV2:
         if not links:
             all_links = soup.find_all('a', href=True)
             links = [link.get('href') for link in all_links 
-                    if re.match(r'/[^/]+/A\d+/A\d+/\d+/', link.get('href', ''))]
+                    if RESTAURANT_LINK_RE.match(link.get('href', ''))]
         
         return links
     
     async def scrape_restaurant_detail_async(self, restaurant_url: str) -> Optional[Dict]:
-        """個別店舗ページから詳細情報を非同期で取得"""
+        """
+        個別店舗ページから詳細情報を非同期で取得
         
-        # 既に処理済みの場合はスキップ
-        if restaurant_url in self.processed_urls:
-            return None
-            
+        処理済みURLの除外は呼び出し側（scrape_restaurants_batch）で行う
+        """
         try:
             # メインページを取得
-            main_html = await self.fetch_page(restaurant_url)
+            main_html = await self.fetch_page(restaurant_url, stop_at_info_table=True)
             
             if not main_html:
                 return None
             
-            soup = BeautifulSoup(main_html, 'html.parser')
+            loop = asyncio.get_running_loop()
             
-            # 店名取得（改良版）
-            shop_name = self._extract_shop_name_v2(soup)
+            # 店名・基本情報を一括取得（解析はスレッドプールで実行）
+            fields = await loop.run_in_executor(self._parse_pool, self._parse_detail, main_html)
+            shop_name = fields['shop_name']
             if not shop_name:
                 logger.warning(f"店名が取得できませんでした: {restaurant_url}")
                 return None
             
-            # 基本情報を取得（新しいセレクタ）
-            address = self._extract_address_v2(soup)
-            phone = self._extract_phone_v2(soup)
-            genre = self._extract_genre_v2(soup)
-            station = self._extract_station_v2(soup)
-            open_time = self._extract_open_time_v2(soup)
+            address = fields['address']
+            phone = fields['phone']
+            genre = fields['genre']
+            station = fields['station']
+            open_time = fields['open_time']
             
             # 情報が不足している場合は地図ページも確認
             if not address or not phone:
                 map_url = restaurant_url.rstrip('/') + '/dtlmap/'
                 map_html = await self.fetch_page(map_url)
                 if map_html:
-                    map_soup = BeautifulSoup(map_html, 'html.parser')
+                    map_phone, map_address = await loop.run_in_executor(
+                        self._parse_pool, self._parse_map, map_html
+                    )
                     if not phone:
-                        phone = self._extract_phone_from_map(map_soup)
+                        phone = map_phone
                     if not address:
-                        address = self._extract_address_from_map(map_soup)
+                        address = map_address
             
             restaurant_info = {
                 'shop_name': shop_name,
@@ -255,16 +583,17 @@ class TabelogScraperAsyncV2:
                 'open_time': open_time,
                 'url': restaurant_url,
                 'source': '食べログ',
-                'scraped_at': datetime.now().isoformat()
+                'scraped_at': self._scraped_at()
             }
             
             # 処理済みとして記録
             self.processed_urls.add(restaurant_url)
             self.results.append(restaurant_info)
+            self._append_result(restaurant_info)
             
             # 定期的に進捗を保存（10件ごと）
             if len(self.results) % 10 == 0:
-                self._save_progress()
+                self._write_checkpoint()
                 logger.info(f"進捗保存: {len(self.results)}件完了")
             
             logger.info(f"✅ 店舗情報取得成功 [{len(self.results)}件目]: {shop_name}")
@@ -274,200 +603,189 @@ class TabelogScraperAsyncV2:
             logger.error(f"店舗詳細取得エラー {restaurant_url}: {e}")
             return None
     
+    def _collect_labeled_cells(self, soup: BeautifulSoup) -> Dict[str, List]:
+        """
+        ラベル付きth/tdの次のセルをラベルごとにまとめる（'th:contains("ラベル") + td' の代替）
+        
+        th/tdを1回だけ走査し、直下のテキストにDETAIL_LABELSを含むセルを記録する
+        """
+        labels = {label: [] for label in DETAIL_LABELS}
+        for cell in soup.find_all(['th', 'td']):
+            texts = cell.find_all(string=True, recursive=False)
+            if not texts:
+                continue
+            for label in DETAIL_LABELS:
+                if any(label in text for text in texts):
+                    next_elem = cell.find_next_sibling()
+                    if next_elem:
+                        labels[label].append(next_elem)
+        return labels
+    
+    def _parse_detail(self, html: str) -> Dict[str, str]:
+        """店舗ページのHTMLを解析して各項目を返す（スレッドプールから呼ばれる）"""
+        # まず必要な範囲だけを解析し、店名が取れなければページ全体で解析し直す
+        fields = None
+        sliced = _slice_detail_html(html)
+        if len(sliced) < len(html):
+            fields = self._extract_all(BeautifulSoup(sliced, HTML_PARSER))
+            if not fields['shop_name']:
+                fields = None
+        if fields is None:
+            fields = self._extract_all(BeautifulSoup(html, HTML_PARSER))
+        
+        # 住所・電話番号が取れなければ、地図ページを取りに行く前に構造化データを確認
+        if not fields['address'] or not fields['phone']:
+            address, phone = self._extract_from_ldjson(html)
+            fields['address'] = fields['address'] or address
+            fields['phone'] = fields['phone'] or phone
+        return fields
+    
+    def _parse_map(self, html: str) -> tuple:
+        """
+        地図ページのHTMLから（電話番号, 住所）を返す（スレッドプールから呼ばれる）
+        
+        どちらも正規表現で取れるため、DOMは構築しない
+        """
+        address, ld_phone = self._extract_from_ldjson(html)
+        return self._extract_phone_from_map(html) or ld_phone, address
+    
+    def _extract_all(self, soup: BeautifulSoup) -> Dict[str, str]:
+        """店舗ページの各項目をまとめて抽出（ラベルセルの走査は1回だけ）"""
+        labels = self._collect_labeled_cells(soup)
+        return {
+            'shop_name': self._extract_shop_name_v2(soup),
+            'address': self._extract_address_v2(soup, labels),
+            'phone': self._extract_phone_v2(soup, labels),
+            'genre': self._extract_genre_v2(soup, labels),
+            'station': self._extract_station_v2(soup, labels),
+            'open_time': self._extract_open_time_v2(soup, labels),
+        }
+    
     def _extract_shop_name_v2(self, soup: BeautifulSoup) -> str:
         """店名を抽出（改良版）"""
         # 優先順位の高い順にセレクタを試す
-        selectors = [
-            'h2.display-name span',
-            'h2.display-name',
-            'h1.display-name span',
-            'h1.display-name',
-            'div.rdheader-info__name span',
-            'div.rdheader-info__name',
-            '.rstinfo-table__name',
-            'h1',
-            'title'
-        ]
-        
-        for selector in selectors:
-            elem = soup.select_one(selector)
+        matches = self.SHOP_NAME_MATCHER.select(soup)
+        for selector in self.SHOP_NAME_SELECTORS:
+            elem = matches.get(selector, [None])[0]
             if elem:
                 text = elem.get_text(strip=True)
                 # クリーンアップ
-                text = re.sub(r'\s*\([^)]+\)\s*$', '', text)  # 括弧内の読み仮名を削除
-                text = re.sub(r'\s+', ' ', text)  # 余分な空白を削除
+                text = READING_PAREN_RE.sub('', text)  # 括弧内の読み仮名を削除
+                text = WHITESPACE_RE.sub(' ', text)  # 余分な空白を削除
                 if text and text != '食べログ':
                     return text.strip()
         
         return ""
     
-    def _extract_address_v2(self, soup: BeautifulSoup) -> str:
+    def _extract_address_v2(self, soup: BeautifulSoup, labels: Optional[Dict[str, List]] = None) -> str:
         """住所を抽出（改良版）"""
-        # 優先順位の高い順にセレクタを試す
-        selectors = [
-            'p.rstinfo-table__address',
-            'span.rstinfo-table__address',
-            'td:contains("住所") + td',
-            'th:contains("住所") + td',
-            'div.rstinfo-table__address',
-            'p.rstdtl-side-address__text',
-            '.rdheader-subinfo__item-text'
-        ]
+        if labels is None:
+            labels = self._collect_labeled_cells(soup)
         
-        for selector in selectors:
+        # 優先順位の高い順にセレクタを試す
+        matches = self.ADDRESS_MATCHER.select(soup)
+        for selector in self.ADDRESS_SELECTORS:
             if ':contains' in selector:
                 # :contains セレクタの処理
-                elements = soup.find_all(text=re.compile('住所'))
-                for elem in elements:
-                    parent = elem.parent
-                    if parent and parent.name in ['td', 'th']:
-                        next_elem = parent.find_next_sibling()
-                        if next_elem:
-                            address = next_elem.get_text(strip=True)
-                            if address:
-                                return address
+                for next_elem in labels['住所']:
+                    address = next_elem.get_text(strip=True)
+                    if address:
+                        return address
             else:
-                elem = soup.select_one(selector)
+                elem = matches.get(selector, [None])[0]
                 if elem:
                     address = elem.get_text(strip=True)
                     # 郵便番号や不要な文字を削除
-                    address = re.sub(r'〒\d{3}-\d{4}\s*', '', address)
-                    address = re.sub(r'^\s*住所\s*[:：]\s*', '', address)
+                    address = ZIP_CODE_RE.sub('', address)
+                    address = ADDRESS_LABEL_RE.sub('', address)
                     if address:
                         return address
         
         return ""
     
-    def _extract_phone_v2(self, soup: BeautifulSoup) -> str:
+    def _extract_phone_v2(self, soup: BeautifulSoup, labels: Optional[Dict[str, List]] = None) -> str:
         """電話番号を抽出（改良版）"""
-        # 電話番号のパターン
-        phone_patterns = [
-            r'03-\d{4}-\d{4}',
-            r'0\d{2,3}-\d{3,4}-\d{4}',
-            r'0\d{9,10}',
-            r'\d{2,4}-\d{2,4}-\d{4}'
-        ]
+        if labels is None:
+            labels = self._collect_labeled_cells(soup)
         
         # 優先順位の高い順にセレクタを試す
-        selectors = [
-            'span.rstinfo-table__tel-num',
-            'p.rstinfo-table__tel',
-            'td:contains("電話番号") + td',
-            'th:contains("電話番号") + td',
-            'div.rstinfo-table__tel',
-            '.rdheader-subinfo__item--tel'
-        ]
-        
-        for selector in selectors:
+        matches = self.PHONE_MATCHER.select(soup)
+        for selector in self.PHONE_SELECTORS:
             if ':contains' in selector:
                 # :contains セレクタの処理
-                elements = soup.find_all(text=re.compile('電話番号'))
-                for elem in elements:
-                    parent = elem.parent
-                    if parent and parent.name in ['td', 'th']:
-                        next_elem = parent.find_next_sibling()
-                        if next_elem:
-                            text = next_elem.get_text(strip=True)
-                            for pattern in phone_patterns:
-                                match = re.search(pattern, text)
-                                if match:
-                                    return match.group()
+                for next_elem in labels['電話番号']:
+                    text = next_elem.get_text(strip=True)
+                    match = PHONE_RE.search(text)
+                    if match:
+                        return match.group()
             else:
-                elem = soup.select_one(selector)
+                elem = matches.get(selector, [None])[0]
                 if elem:
                     text = elem.get_text(strip=True)
-                    for pattern in phone_patterns:
-                        match = re.search(pattern, text)
-                        if match:
-                            return match.group()
+                    match = PHONE_RE.search(text)
+                    if match:
+                        return match.group()
         
         return ""
     
-    def _extract_genre_v2(self, soup: BeautifulSoup) -> str:
+    def _extract_genre_v2(self, soup: BeautifulSoup, labels: Optional[Dict[str, List]] = None) -> str:
         """ジャンルを抽出（改良版）"""
-        # まず、明確にジャンルとラベルされているセレクタを優先
-        priority_selectors = [
-            'td:contains("ジャンル") + td',
-            'th:contains("ジャンル") + td',
-            '.rstinfo-table__genre',
-            'span[property="v:category"]'
-        ]
+        if labels is None:
+            labels = self._collect_labeled_cells(soup)
+        
+        matches = self.GENRE_MATCHER.select(soup)
         
-        for selector in priority_selectors:
+        # まず、明確にジャンルとラベルされているセレクタを優先
+        for selector in self.GENRE_PRIORITY_SELECTORS:
             if ':contains' in selector:
-                elements = soup.find_all(text=re.compile('ジャンル'))
-                for elem in elements:
-                    parent = elem.parent
-                    if parent and parent.name in ['td', 'th']:
-                        next_elem = parent.find_next_sibling()
-                        if next_elem:
-                            genre = next_elem.get_text(strip=True)
-                            if genre:
-                                return genre
+                for next_elem in labels['ジャンル']:
+                    genre = next_elem.get_text(strip=True)
+                    if genre:
+                        return genre
             else:
-                elem = soup.select_one(selector)
+                elem = matches.get(selector, [None])[0]
                 if elem:
                     genre = elem.get_text(strip=True)
                     if genre and genre != '飲食店':
                         return genre
         
         # 次に、より一般的なセレクタを試すが、駅名を除外
-        general_selectors = [
-            'span.linktree__parent-target-text',
-            'div.rdheader-subinfo__item-text'
-        ]
-        
-        for selector in general_selectors:
-            elements = soup.select(selector)
+        for selector in self.GENRE_GENERAL_SELECTORS:
+            elements = matches.get(selector, [])
             for elem in elements:
                 text = elem.get_text(strip=True)
                 # 駅名でないことを確認（「駅」が含まれていない、かつ料理ジャンルの特徴がある）
                 if text and '駅' not in text and not text.endswith('線'):
                     # 一般的な料理ジャンルのキーワードをチェック
-                    genre_keywords = ['料理', '焼', '鍋', '寿司', '鮨', 'そば', 'うどん', 'ラーメン', 
-                                    'カレー', 'イタリアン', 'フレンチ', '中華', '和食', '洋食', 
-                                    'カフェ', 'バー', '居酒屋', '食堂', 'レストラン', '肉', '魚', 
-                                    '野菜', '串', '天ぷら', '丼', '定食']
-                    if any(keyword in text for keyword in genre_keywords) or len(text) < 20:
+                    if any(keyword in text for keyword in self.GENRE_KEYWORDS) or len(text) < 20:
                         return text
         
         return ""
     
-    def _extract_station_v2(self, soup: BeautifulSoup) -> str:
+    def _extract_station_v2(self, soup: BeautifulSoup, labels: Optional[Dict[str, List]] = None) -> str:
         """最寄り駅を抽出（改良版）"""
-        selectors = [
-            'span.linktree__parent-target-text:contains("駅")',
-            'td:contains("交通手段") + td',
-            'th:contains("交通手段") + td',
-            'td:contains("最寄り駅") + td',
-            'th:contains("最寄り駅") + td',
-            '.rstinfo-table__access',
-            'dl.rdheader-subinfo__item--station'
-        ]
+        if labels is None:
+            labels = self._collect_labeled_cells(soup)
         
-        for selector in selectors:
+        matches = self.STATION_MATCHER.select(soup)
+        for selector in self.STATION_SELECTORS:
             if ':contains' in selector:
                 if '交通手段' in selector or '最寄り駅' in selector:
                     pattern = '交通手段' if '交通手段' in selector else '最寄り駅'
-                    elements = soup.find_all(text=re.compile(pattern))
-                    for elem in elements:
-                        parent = elem.parent
-                        if parent and parent.name in ['td', 'th']:
-                            next_elem = parent.find_next_sibling()
-                            if next_elem:
-                                station = next_elem.get_text(strip=True)
-                                # 最初の駅名だけ抽出
-                                station = station.split('、')[0].split('から')[0]
-                                if station:
-                                    return station
+                    for next_elem in labels[pattern]:
+                        station = next_elem.get_text(strip=True)
+                        # 最初の駅名だけ抽出
+                        station = station.split('、')[0].split('から')[0]
+                        if station:
+                            return station
                 else:
-                    elem = soup.select_one(selector)
+                    elem = matches.get(selector, [None])[0]
                     if elem:
                         station = elem.get_text(strip=True)
                         if '駅' in station:
                             return station
             else:
-                elem = soup.select_one(selector)
+                elem = matches.get(selector, [None])[0]
                 if elem:
                     station = elem.get_text(strip=True)
                     station = station.split('、')[0].split('から')[0]
@@ -476,76 +794,67 @@ class TabelogScraperAsyncV2:
         
         return ""
     
-    def _extract_open_time_v2(self, soup: BeautifulSoup) -> str:
+    def _extract_open_time_v2(self, soup: BeautifulSoup, labels: Optional[Dict[str, List]] = None) -> str:
         """営業時間を抽出（改良版）"""
-        selectors = [
-            'td:contains("営業時間") + td',
-            'th:contains("営業時間") + td',
-            'p.rstinfo-table__open-hours',
-            '.rstinfo-table__open-hours',
-            'dl.rdheader-subinfo__item--open-hours'
-        ]
+        if labels is None:
+            labels = self._collect_labeled_cells(soup)
         
-        for selector in selectors:
+        matches = self.OPEN_TIME_MATCHER.select(soup)
+        for selector in self.OPEN_TIME_SELECTORS:
             if ':contains' in selector:
-                elements = soup.find_all(text=re.compile('営業時間'))
-                for elem in elements:
-                    parent = elem.parent
-                    if parent and parent.name in ['td', 'th']:
-                        next_elem = parent.find_next_sibling()
-                        if next_elem:
-                            hours = next_elem.get_text(strip=True)
-                            # 改行を整理
-                            hours = re.sub(r'\s+', ' ', hours)
-                            if hours:
-                                return hours
+                for next_elem in labels['営業時間']:
+                    hours = next_elem.get_text(strip=True)
+                    # 改行を整理
+                    hours = WHITESPACE_RE.sub(' ', hours)
+                    if hours:
+                        return hours
             else:
-                elem = soup.select_one(selector)
+                elem = matches.get(selector, [None])[0]
                 if elem:
                     hours = elem.get_text(strip=True)
-                    hours = re.sub(r'\s+', ' ', hours)
+                    hours = WHITESPACE_RE.sub(' ', hours)
                     if hours:
                         return hours
         
         return ""
     
-    def _extract_phone_from_map(self, soup: BeautifulSoup) -> str:
-        """地図ページから電話番号を抽出"""
-        phone_patterns = [
-            r'03-\d{4}-\d{4}',
-            r'0\d{2,3}-\d{3,4}-\d{4}',
-            r'0\d{9,10}'
-        ]
-        
-        text = soup.get_text()
-        for pattern in phone_patterns:
-            match = re.search(pattern, text)
-            if match:
-                return match.group()
+    def _extract_phone_from_map(self, html: str) -> str:
+        """地図ページの生HTMLから電話番号を抽出"""
+        # 属性値やスクリプト内の数字を拾わないよう、タグとscript/styleを除いてから検索
+        text = TAG_RE.sub(' ', SCRIPT_STYLE_RE.sub(' ', html))
+        match = MAP_PHONE_RE.search(text)
+        if match:
+            return match.group()
         
         return ""
     
-    def _extract_address_from_map(self, soup: BeautifulSoup) -> str:
-        """地図ページから住所を抽出"""
-        # scriptタグ内のJSONデータから住所を探す
-        scripts = soup.find_all('script', type='application/ld+json')
-        for script in scripts:
+    def _extract_from_ldjson(self, html: str) -> tuple:
+        """scriptタグ内のJSON-LDから（住所, 電話番号）を抽出（店舗ページ・地図ページ共通）"""
+        address = ""
+        phone = ""
+        for block in LDJSON_RE.findall(html):
             try:
-                data = json.loads(script.string)
-                if isinstance(data, dict) and 'address' in data:
-                    if isinstance(data['address'], dict):
-                        address_parts = []
-                        for key in ['addressRegion', 'addressLocality', 'streetAddress']:
-                            if key in data['address']:
-                                address_parts.append(data['address'][key])
-                        if address_parts:
-                            return ''.join(address_parts)
-                    elif isinstance(data['address'], str):
-                        return data['address']
-            except:
-                pass
+                data = _loads(block)
+            except Exception:
+                continue
+            if not isinstance(data, dict):
+                continue
+            if not address and 'address' in data:
+                if isinstance(data['address'], dict):
+                    address_parts = []
+                    for key in ['addressRegion', 'addressLocality', 'streetAddress']:
+                        if key in data['address']:
+                            address_parts.append(data['address'][key])
+                    if address_parts:
+                        address = ''.join(address_parts)
+                elif isinstance(data['address'], str):
+                    address = data['address']
+            if not phone and isinstance(data.get('telephone'), str):
+                phone = data['telephone'].strip()
+            if address and phone:
+                break
         
-        return ""
+        return address, phone
     
     async def scrape_restaurants_batch(self, areas: List[str], max_per_area: int = 100) -> List[Dict]:
         """
@@ -554,46 +863,49 @@ class TabelogScraperAsyncV2:
         area_urls = self.get_area_urls()
         all_restaurants = []
         
+        target_areas = []
         for area in areas:
             if area not in area_urls:
                 logger.warning(f"未対応の地域: {area}")
                 continue
-            
-            logger.info(f"🍽️ {area}のデータ取得開始")
-            area_url = area_urls[area]
-            
-            # 必要なページ数を計算（1ページ20件として）
-            max_pages = (max_per_area + 19) // 20
-            
-            # 店舗URLリストを取得
-            restaurant_urls = await self.scrape_restaurant_list_async(area_url, max_pages)
-            
-            # 指定件数に制限
-            restaurant_urls = restaurant_urls[:max_per_area]
-            
-            # バッチで詳細情報を取得
-            batch_size = 20  # 20件ずつ処理
-            for i in range(0, len(restaurant_urls), batch_size):
-                batch_urls = restaurant_urls[i:i + batch_size]
-                
-                tasks = []
-                for url in batch_urls:
-                    if url not in self.processed_urls:
-                        task = self.scrape_restaurant_detail_async(url)
-                        tasks.append(task)
-                
-                if tasks:
-                    logger.info(f"バッチ処理中: {i+1}-{min(i+batch_size, len(restaurant_urls))}/{len(restaurant_urls)}")
-                    batch_results = await asyncio.gather(*tasks)
-                    
-                    # 有効な結果のみ追加
-                    valid_results = [r for r in batch_results if r is not None]
-                    all_restaurants.extend(valid_results)
-                    
-                    # 進捗を保存
-                    self._save_progress()
+            target_areas.append(area)
+        
+        # 必要なページ数を計算（1ページ20件として）
+        max_pages = (max_per_area + 19) // 20
+        
+        # 全地域の店舗URLリストをまとめて取得
+        logger.info(f"🍽️ {'、'.join(target_areas)}のデータ取得開始")
+        area_lists = await asyncio.gather(*[
+            self.scrape_restaurant_list_async(area_urls[area], max_pages)
+            for area in target_areas
+        ])
+        
+        # 地域ごとに指定件数に制限し、処理済み・地域間で重複するURLを除外
+        restaurant_urls = []
+        seen_urls: Set[str] = set(self.processed_urls)
+        for urls in area_lists:
+            for url in urls[:max_per_area]:
+                if url not in seen_urls:
+                    seen_urls.add(url)
+                    restaurant_urls.append(url)
+        
+        # 全店舗の詳細取得を一度にスケジュールし、同時接続数はfetch_pageのセマフォだけで制御する
+        total = len(restaurant_urls)
+        tasks = [asyncio.ensure_future(self.scrape_restaurant_detail_async(url)) for url in restaurant_urls]
+        try:
+            for done, future in enumerate(asyncio.as_completed(tasks), start=1):
+                result = await future
+                if result is not None:
+                    all_restaurants.append(result)
+                if done % 20 == 0 or done == total:
+                    logger.info(f"詳細取得中: {done}/{total}")
+        finally:
+            # 中断された場合は残りのタスクを取り消す
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
         
         # 最終保存
-        self._save_progress()
+        self._write_checkpoint()
         
         return all_restaurants
\ No newline at end of file
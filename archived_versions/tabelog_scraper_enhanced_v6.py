@@ -9,17 +9,41 @@
 
 import asyncio
 import aiohttp
+import gzip
+import hashlib
 import json
+import os
 import re
 import random
+import socket
 import time
 from datetime import datetime
 from typing import Dict, List, Optional, Set
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from pathlib import Path
 import logging
+import soupsieve
 from aiohttp import ClientTimeout, TCPConnector
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# DNS解決（aiodnsがあればスレッドを使わない非同期リゾルバを使う）
+try:
+    import aiodns  # noqa: F401
+    HAS_AIODNS = True
+except ImportError:
+    HAS_AIODNS = False
+
+# Excel出力（xlsxwriterがあればopenpyxlより高速に書き出せる）
+try:
+    import xlsxwriter  # noqa: F401
+    HAS_XLSXWRITER = True
+except ImportError:
+    HAS_XLSXWRITER = False
+
 # ロギング設定
 logging.basicConfig(
     level=logging.INFO,
@@ -31,15 +55,163 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# HTMLパーサー（C実装のlxmlが使えればそちらを使う）
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+def _loads(raw):
+    """JSONをデコード（orjsonがあれば高速にデコード）"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def _dumps(data, indent: bool = False) -> bytes:
+    """JSONをUTF-8のバイト列にエンコード（orjsonがあれば高速にエンコード）"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(data, ensure_ascii=False, indent=2 if indent else None).encode('utf-8')
+
+# 取得済みHTMLのディスクキャッシュの有効期限（再実行時は通信せずに再利用）
+HTML_CACHE_TTL = 7 * 24 * 60 * 60  # 7日
+
+# 抽出用の正規表現（店舗ごと・項目ごとに使うのでモジュール読み込み時にコンパイル）
+READING_PAREN_RE = re.compile(r'\s*\([^)]+\)\s*$')
+WHITESPACE_RE = re.compile(r'\s+')
+ZIP_CODE_RE = re.compile(r'〒\d{3}-\d{4}\s*')
+PHONE_RES = tuple(re.compile(pattern) for pattern in (
+    r'03-\d{4}-\d{4}',
+    r'0\d{2,3}-\d{3,4}-\d{4}',
+    r'0\d{9,10}'
+))
+SEAT_RES = tuple(re.compile(pattern) for pattern in (
+    r'(\d+)\s*席',
+    r'席数\s*[:：]\s*(\d+)',
+    r'(\d+)\s*seats'
+))
+# 公式サイトリンクのラベル
+OFFICIAL_KEYWORDS = ('ホームページ', '公式', 'Official', 'HP', 'Website')
+# 外部リンクのテキスト判定（リンク文言は大文字小文字を区別する）
+OFFICIAL_TEXT_RE = re.compile('|'.join(re.escape(keyword) for keyword in OFFICIAL_KEYWORDS))
+# 公式サイトがない場合の代替にするSNSのホスト
+SNS_HOSTS = ('instagram.com', 'twitter.com', 'x.com', 'facebook.com')
+# th/tdのラベル判定（全ラベルを1つの正規表現にまとめ、一致したグループ名で項目に振り分ける）
+LABEL_RE = re.compile(
+    '(?P<genre>ジャンル)'
+    '|(?P<station>交通手段|最寄り駅)'
+    '|(?P<open_time>営業時間)'
+    '|(?P<seats>席数|座席)'
+    + ''.join(f'|(?P<official{i}>{re.escape(keyword)})' for i, keyword in enumerate(OFFICIAL_KEYWORDS)),
+    re.IGNORECASE
+)
+# 一覧ページで木を作る要素（店舗リンクとその見出しだけを解析する）
+LIST_LINK_STRAINER = SoupStrainer(['h3', 'a'])
+# ページごとに使うCSSセレクタ（毎回の文字列解析を避けるため読み込み時にコンパイル）
+LIST_LINK_SELECTOR = soupsieve.compile('a.list-rst__rst-name-target')
+LIST_LINK_FALLBACK_SELECTOR = soupsieve.compile('h3.list-rst__rst-name a')
+RATING_BLOCK_SELECTOR = soupsieve.compile('.rdheader-rating, .rstdtl-rating')
+# 1回の走査で要素を集めておくクラス名（各項目のセレクタで使うもの）
+INDEXED_CLASSES = frozenset({
+    'display-name', 'rstinfo-table__name',
+    'rstinfo-table__tel-num', 'rstinfo-table__tel',
+    'rstinfo-table__address', 'rstinfo-table__genre', 'rstinfo-table__open-hours',
+    'rstinfo-table',
+    'rstdtl-rating__review-count', 'rdheader-rating__review-count',
+    'rdheader-rating__score-val-dtl', 'c-rating__val', 'rstdtl-rating__score', 'rdheader-rating__score',
+})
+DIGITS_RE = re.compile(r'(\d+)')
+# 口コミ数の表記（4パターンを1つにまとめ、一致したグループから数字を取る）
+REVIEW_RE = re.compile(
+    r'(\d+)\s*件の口コミ'
+    r'|口コミ\s*(\d+)\s*件'
+    r'|レビュー\s*(\d+)'
+    r'|(\d+)\s*reviews'
+)
+RATING_VALUE_RE = re.compile(r'(\d+\.\d+)')
+# 価格パターン（¥1,000～¥1,999 など）
+BUDGET_RANGE_RE = re.compile(r'¥[\d,]+\s*[~～-]\s*¥[\d,]+')
+BUDGET_KEYWORD_RES = {
+    'dinner': tuple(re.compile(keyword) for keyword in ('夜', 'ディナー', '夕食')),
+    'lunch': tuple(re.compile(keyword) for keyword in ('昼', 'ランチ', '昼食')),
+}
+
+class RateLimiter:
+    """トークンバケット方式のレート制限（全ワーカー共通で1秒あたりのリクエスト数を制御）"""
+    
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        初期化
+        
+        Args:
+            rate: 1秒あたりに補充するトークン数（定常時のリクエスト数）
+            burst: 一度に消費できる最大トークン数
+        """
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+    
+    async def acquire(self):
+        """トークンを1つ取得（不足している場合は補充されるまで待機）"""
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
 class TabelogEnhancedScraperV6:
     """拡張版食べログスクレイパー"""
     
-    def __init__(self, max_concurrent: int = 5):
-        """初期化"""
+    # 各項目のセレクタ（優先順）。(クラス名, タグ名, 子孫タグ名) で
+    # 'タグ名.クラス名 子孫タグ名' を表し、_index_page で集めた要素から引く
+    SHOP_NAME_SELECTORS = (
+        ('display-name', 'h2', 'span'),   # h2.display-name span
+        ('display-name', 'h2', None),     # h2.display-name
+        ('display-name', 'h1', 'span'),   # h1.display-name span
+        ('display-name', 'h1', None),     # h1.display-name
+        ('rstinfo-table__name', None, None),
+    )
+    PHONE_SELECTORS = (
+        ('rstinfo-table__tel-num', 'span', None),
+        ('rstinfo-table__tel', 'p', None),
+    )
+    ADDRESS_SELECTORS = (
+        ('rstinfo-table__address', 'p', None),
+        ('rstinfo-table__address', 'span', None),
+    )
+    REVIEW_COUNT_SELECTORS = (
+        ('rstdtl-rating__review-count', 'em', None),
+        ('rstdtl-rating__review-count', 'span', None),
+        ('rdheader-rating__review-count', None, 'em'),
+        ('rdheader-rating__review-count', 'em', None),
+    )
+    RATING_SELECTORS = (
+        ('rdheader-rating__score-val-dtl', 'span', None),
+        ('c-rating__val', 'b', None),
+        ('rstdtl-rating__score', 'span', None),
+        ('rdheader-rating__score', None, 'em'),
+    )
+    
+    def __init__(self, max_concurrent: int = 5, requests_per_second: float = 1.0):
+        """
+        初期化
+        
+        Args:
+            max_concurrent: 最大同時接続数
+            requests_per_second: 全体での1秒あたりのリクエスト数（最初は max_concurrent 件まで即時に送れる）
+        """
         self.max_concurrent = max_concurrent
         self.semaphore = asyncio.Semaphore(max_concurrent)
         self.session = None
-        self.delay_range = (3.0, 5.0)  # 適度な遅延
+        # 遅延はリクエストごとではなく、全体のレートで制御する
+        self.rate_limiter = RateLimiter(requests_per_second, burst=max_concurrent)
         
         # 進捗管理
         self.processed_urls: Set[str] = set()
@@ -49,12 +221,26 @@ class TabelogEnhancedScraperV6:
         self.cache_dir = Path("cache")
         self.cache_dir.mkdir(exist_ok=True)
         self.progress_file = self.cache_dir / "enhanced_progress_v6.json"
-        self.results_file = self.cache_dir / "enhanced_results_v6.json"
+        # 取得結果は1件1行のJSONLに追記する（全件の書き直しをしない）
+        self.results_file = self.cache_dir / "enhanced_results_v6.jsonl"
+        self.legacy_results_file = self.cache_dir / "enhanced_results_v6.json"
+        self.html_cache_dir = self.cache_dir / "html"
+        self.html_cache_dir.mkdir(exist_ok=True)
+        self._results_fp = None
         
     async def __aenter__(self):
         """非同期コンテキストマネージャ入口"""
         timeout = ClientTimeout(total=30, connect=10, sock_read=10)
-        connector = TCPConnector(limit=self.max_concurrent, force_close=True)
+        # 接続先は食べログのみなので、keep-aliveで接続（TLSセッション）を使い回す
+        # 名前解決の結果はキャッシュし、IPv6の接続試行は省く
+        connector = TCPConnector(
+            limit=self.max_concurrent,
+            limit_per_host=self.max_concurrent,
+            ttl_dns_cache=600,
+            family=socket.AF_INET,
+            resolver=aiohttp.AsyncResolver() if HAS_AIODNS else None,
+            enable_cleanup_closed=True
+        )
         self.session = aiohttp.ClientSession(
             timeout=timeout,
             connector=connector,
@@ -63,12 +249,16 @@ class TabelogEnhancedScraperV6:
         
         # 進捗を読み込む
         self.load_progress()
+        self._open_results_log()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """非同期コンテキストマネージャ出口"""
         if self.session:
             await self.session.close()
+        if self._results_fp:
+            self._results_fp.close()
+            self._results_fp = None
     
     def _get_headers(self) -> Dict[str, str]:
         """リクエストヘッダーを取得"""
@@ -89,45 +279,118 @@ class TabelogEnhancedScraperV6:
         }
     
     def load_progress(self):
-        """前回の進捗を読み込む"""
+        """前回の進捗を読み込む（処理済みURLは追記済みの結果から復元する）"""
         try:
-            if self.progress_file.exists():
-                with open(self.progress_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.processed_urls = set(data.get('processed_urls', []))
-                    logger.info(f"前回の進捗を読み込み: {len(self.processed_urls)}件処理済み")
-            
             if self.results_file.exists():
-                with open(self.results_file, 'r', encoding='utf-8') as f:
-                    self.results = json.load(f)
+                with open(self.results_file, 'rb') as f:
+                    for line in f:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        try:
+                            self.results.append(_loads(line))
+                        except ValueError:
+                            # 書き込み途中で中断された最終行は読み飛ばす
+                            logger.warning("結果ログの不完全な行をスキップしました")
+                logger.info(f"前回の結果を読み込み: {len(self.results)}件")
+            elif self.legacy_results_file.exists():
+                # 旧形式（全件JSON）からの移行
+                with open(self.legacy_results_file, 'rb') as f:
+                    self.results = _loads(f.read())
                     logger.info(f"前回の結果を読み込み: {len(self.results)}件")
+            
+            self.processed_urls = {r['url'] for r in self.results if r.get('url')}
+            # 旧形式の進捗ファイルに残っている処理済みURLも引き継ぐ
+            if self.progress_file.exists():
+                with open(self.progress_file, 'rb') as f:
+                    self.processed_urls.update(_loads(f.read()).get('processed_urls', []))
+            if self.processed_urls:
+                logger.info(f"前回の進捗を読み込み: {len(self.processed_urls)}件処理済み")
                 
         except Exception as e:
             logger.error(f"進捗読み込みエラー: {e}")
     
+    def _open_results_log(self):
+        """結果のJSONLを追記モードで開く（旧形式から移行する場合は既存結果を書き込む）"""
+        is_new = not self.results_file.exists()
+        self._results_fp = open(self.results_file, 'ab')
+        # 前回が書き込み途中で中断していた場合、次の行と連結しないよう改行を補う
+        if not is_new and self._results_fp.tell() > 0:
+            with open(self.results_file, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    self._results_fp.write(b'\n')
+        if is_new and self.results:
+            for result in self.results:
+                self._results_fp.write(_dumps(result) + b'\n')
+            self._results_fp.flush()
+    
+    def _append_result(self, result: Dict):
+        """1件分の結果をJSONLに追記"""
+        if not self._results_fp:
+            return
+        try:
+            self._results_fp.write(_dumps(result) + b'\n')
+            self._results_fp.flush()
+        except Exception as e:
+            logger.error(f"結果追記エラー: {e}")
+    
     def save_progress(self):
-        """進捗を保存"""
+        """進捗を保存（結果と処理済みURLはJSONLに逐次追記済みなので件数と時刻のみ）"""
         try:
-            with open(self.progress_file, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'processed_urls': list(self.processed_urls),
+            with open(self.progress_file, 'wb') as f:
+                f.write(_dumps({
                     'total_processed': len(self.processed_urls),
                     'timestamp': datetime.now().isoformat()
-                }, f, ensure_ascii=False, indent=2)
-            
-            with open(self.results_file, 'w', encoding='utf-8') as f:
-                json.dump(self.results, f, ensure_ascii=False, indent=2)
+                }, indent=True))
                     
         except Exception as e:
             logger.error(f"進捗保存エラー: {e}")
     
-    async def fetch_page(self, url: str) -> Optional[str]:
-        """ページを非同期で取得"""
+    def _cache_path(self, url: str) -> Path:
+        """URLに対応するキャッシュファイルのパス"""
+        return self.html_cache_dir / (hashlib.sha1(url.encode('utf-8')).hexdigest() + '.html.gz')
+    
+    def _read_cache(self, url: str) -> Optional[bytes]:
+        """有効期限内のキャッシュがあれば本文のバイト列を返す"""
+        path = self._cache_path(url)
+        try:
+            if time.time() - path.stat().st_mtime > HTML_CACHE_TTL:
+                return None
+            return gzip.decompress(path.read_bytes())
+        except (OSError, EOFError):
+            return None
+    
+    def _write_cache(self, url: str, body: bytes):
+        """取得した本文をキャッシュに保存"""
+        try:
+            self._cache_path(url).write_bytes(gzip.compress(body, compresslevel=5))
+        except OSError as e:
+            logger.warning(f"キャッシュ保存エラー {url}: {e}")
+    
+    async def fetch_page(self, url: str, as_bytes: bool = False):
+        """
+        ページを非同期で取得
+        
+        Args:
+            url: 取得するURL
+            as_bytes: Trueの場合は本文を文字列にデコードせず、受信したチャンクをまとめたバイト列で返す
+                （文字コードの判定はパーサーに任せる）
+        """
+        # キャッシュヒット時はアクセスしないのでレート制限も不要
+        cached = self._read_cache(url)
+        if cached is not None:
+            if as_bytes:
+                return cached
+            try:
+                return cached.decode('utf-8')
+            except UnicodeDecodeError:
+                pass
+        
         async with self.semaphore:
             try:
-                # ランダムな遅延
-                delay = random.uniform(*self.delay_range)
-                await asyncio.sleep(delay)
+                # 全体のリクエストレートを制限
+                await self.rate_limiter.acquire()
                 
                 # ヘッダーを更新
                 self.session.headers['User-Agent'] = random.choice([
@@ -138,7 +401,16 @@ class TabelogEnhancedScraperV6:
                 
                 async with self.session.get(url) as response:
                     if response.status == 200:
-                        return await response.text()
+                        if not as_bytes:
+                            html = await response.text()
+                            self._write_cache(url, html.encode('utf-8'))
+                            return html
+                        body = bytearray()
+                        async for chunk, _ in response.content.iter_chunks():
+                            body.extend(chunk)
+                        body = bytes(body)
+                        self._write_cache(url, body)
+                        return body
                     elif response.status == 429:
                         logger.warning(f"レート制限検出: {url}")
                         await asyncio.sleep(30)
@@ -160,14 +432,18 @@ class TabelogEnhancedScraperV6:
         if restaurant_url in self.processed_urls:
             return None
         
-        html = await self.fetch_page(restaurant_url)
+        # 本文はバイト列のまま渡し、文字コードの判定とデコードはパーサー（lxml）に任せる
+        html = await self.fetch_page(restaurant_url, as_bytes=True)
         if not html:
             return None
         
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = BeautifulSoup(html, HTML_PARSER)
+        
+        # 各項目で使う要素（クラス・リンク・ラベル付きth/td）は1回の走査でまとめて集める
+        index = self._index_page(soup)
         
         # 基本情報取得
-        shop_name = self._extract_shop_name(soup)
+        shop_name = self._extract_shop_name(soup, index)
         if not shop_name:
             return None
         
@@ -175,16 +451,16 @@ class TabelogEnhancedScraperV6:
         info = {
             'shop_name': shop_name,
             'url': restaurant_url,
-            'phone': self._extract_phone(soup),
-            'address': self._extract_address(soup),
-            'genre': self._extract_genre(soup),
-            'station': self._extract_station(soup),
-            'open_time': self._extract_open_time(soup),
+            'phone': self._extract_phone(soup, index),
+            'address': self._extract_address(soup, index),
+            'genre': self._extract_genre(soup, index),
+            'station': self._extract_station(soup, index),
+            'open_time': self._extract_open_time(soup, index),
             # 新規追加項目
-            'seats': self._extract_seats(soup),
-            'official_url': self._extract_official_url(soup),
-            'review_count': self._extract_review_count(soup),
-            'rating': self._extract_rating(soup),
+            'seats': self._extract_seats(soup, index),
+            'official_url': self._extract_official_url(soup, index),
+            'review_count': self._extract_review_count(soup, index),
+            'rating': self._extract_rating(soup, index),
             'budget_dinner': self._extract_budget(soup, 'dinner'),
             'budget_lunch': self._extract_budget(soup, 'lunch'),
             'source': '食べログ',
@@ -194,72 +470,99 @@ class TabelogEnhancedScraperV6:
         self.processed_urls.add(restaurant_url)
         return info
     
-    def _extract_shop_name(self, soup: BeautifulSoup) -> str:
+    def _index_page(self, soup: BeautifulSoup) -> Dict[str, List]:
+        """
+        ページを1回だけ走査し、抽出に使う要素を文書順にまとめる
+        
+        - INDEXED_CLASSES のクラスを持つ要素: クラス名がキー
+        - hrefを持つリンク: 'a[href]'
+        - ラベルを含むth/td: 'label:' + LABEL_RE のグループ名
+        """
+        index: Dict[str, List] = {}
+        for elem in soup.find_all(True):
+            classes = elem.get('class')
+            if classes:
+                for cls in classes:
+                    if cls in INDEXED_CLASSES:
+                        index.setdefault(cls, []).append(elem)
+            if elem.name == 'a':
+                if elem.get('href'):
+                    index.setdefault('a[href]', []).append(elem)
+            elif elem.name in ('th', 'td'):
+                text = elem.string
+                if text:
+                    for name in {match.lastgroup for match in LABEL_RE.finditer(text)}:
+                        index.setdefault('label:' + name, []).append(elem)
+        return index
+    
+    def _select_indexed(self, index: Dict[str, List], selector: tuple):
+        """(クラス名, タグ名, 子孫タグ名) のセレクタに最初に一致する要素を返す（select_one 相当）"""
+        cls, name, descendant = selector
+        for elem in index.get(cls, []):
+            if name and elem.name != name:
+                continue
+            if descendant:
+                found = elem.find(descendant)
+                if found:
+                    return found
+                continue
+            return elem
+        return None
+    
+    def _extract_shop_name(self, soup: BeautifulSoup, index: Optional[Dict[str, List]] = None) -> str:
         """店名を抽出"""
-        selectors = [
-            'h2.display-name span',
-            'h2.display-name',
-            'h1.display-name span',
-            'h1.display-name',
-            '.rstinfo-table__name'
-        ]
+        if index is None:
+            index = self._index_page(soup)
         
-        for selector in selectors:
-            elem = soup.select_one(selector)
+        for selector in self.SHOP_NAME_SELECTORS:
+            elem = self._select_indexed(index, selector)
             if elem:
                 text = elem.get_text(strip=True)
-                text = re.sub(r'\s*\([^)]+\)\s*$', '', text)
-                text = re.sub(r'\s+', ' ', text)
+                text = READING_PAREN_RE.sub('', text)
+                text = WHITESPACE_RE.sub(' ', text)
                 if text and text != '食べログ':
                     return text.strip()
         
         return ""
     
-    def _extract_phone(self, soup: BeautifulSoup) -> str:
+    def _extract_phone(self, soup: BeautifulSoup, index: Optional[Dict[str, List]] = None) -> str:
         """電話番号を抽出"""
-        phone_patterns = [
-            r'03-\d{4}-\d{4}',
-            r'0\d{2,3}-\d{3,4}-\d{4}',
-            r'0\d{9,10}'
-        ]
-        
-        selectors = [
-            'span.rstinfo-table__tel-num',
-            'p.rstinfo-table__tel'
-        ]
+        if index is None:
+            index = self._index_page(soup)
         
-        for selector in selectors:
-            elem = soup.select_one(selector)
+        for selector in self.PHONE_SELECTORS:
+            elem = self._select_indexed(index, selector)
             if elem:
                 text = elem.get_text(strip=True)
-                for pattern in phone_patterns:
-                    match = re.search(pattern, text)
+                for pattern in PHONE_RES:
+                    match = pattern.search(text)
                     if match:
                         return match.group()
         
         return ""
     
-    def _extract_address(self, soup: BeautifulSoup) -> str:
+    def _extract_address(self, soup: BeautifulSoup, index: Optional[Dict[str, List]] = None) -> str:
         """住所を抽出"""
-        selectors = [
-            'p.rstinfo-table__address',
-            'span.rstinfo-table__address'
-        ]
+        if index is None:
+            index = self._index_page(soup)
         
-        for selector in selectors:
-            elem = soup.select_one(selector)
+        for selector in self.ADDRESS_SELECTORS:
+            elem = self._select_indexed(index, selector)
             if elem:
                 address = elem.get_text(strip=True)
-                address = re.sub(r'〒\d{3}-\d{4}\s*', '', address)
+                address = ZIP_CODE_RE.sub('', address)
                 if address:
                     return address
         
         return ""
     
-    def _extract_genre(self, soup: BeautifulSoup) -> str:
+    def _extract_genre(self, soup: BeautifulSoup, index: Optional[Dict[str, List]] = None) -> str:
         """ジャンルを抽出"""
+        if index is None:
+            index = self._index_page(soup)
+        
         # ジャンル専用セレクタ
-        for th in soup.find_all(['th', 'td'], string=re.compile('ジャンル')):
+        for th in index.get('label:genre', []):
             next_elem = th.find_next_sibling()
             if next_elem:
                 genre = next_elem.get_text(strip=True)
@@ -267,15 +570,18 @@ class TabelogEnhancedScraperV6:
                     return genre
         
         # その他のセレクタ
-        genre_elem = soup.select_one('.rstinfo-table__genre')
+        genre_elem = self._select_indexed(index, ('rstinfo-table__genre', None, None))
         if genre_elem:
             return genre_elem.get_text(strip=True)
         
         return ""
     
-    def _extract_station(self, soup: BeautifulSoup) -> str:
+    def _extract_station(self, soup: BeautifulSoup, index: Optional[Dict[str, List]] = None) -> str:
         """最寄り駅を抽出"""
-        for th in soup.find_all(['th', 'td'], string=re.compile('交通手段|最寄り駅')):
+        if index is None:
+            index = self._index_page(soup)
+        
+        for th in index.get('label:station', []):
             next_elem = th.find_next_sibling()
             if next_elem:
                 station = next_elem.get_text(strip=True)
@@ -285,38 +591,37 @@ class TabelogEnhancedScraperV6:
         
         return ""
     
-    def _extract_open_time(self, soup: BeautifulSoup) -> str:
+    def _extract_open_time(self, soup: BeautifulSoup, index: Optional[Dict[str, List]] = None) -> str:
         """営業時間を抽出"""
-        for th in soup.find_all(['th', 'td'], string=re.compile('営業時間')):
+        if index is None:
+            index = self._index_page(soup)
+        
+        for th in index.get('label:open_time', []):
             next_elem = th.find_next_sibling()
             if next_elem:
                 hours = next_elem.get_text(strip=True)
-                hours = re.sub(r'\s+', ' ', hours)
+                hours = WHITESPACE_RE.sub(' ', hours)
                 if hours:
                     return hours
         
-        hours_elem = soup.select_one('p.rstinfo-table__open-hours')
+        hours_elem = self._select_indexed(index, ('rstinfo-table__open-hours', 'p', None))
         if hours_elem:
-            return re.sub(r'\s+', ' ', hours_elem.get_text(strip=True))
+            return WHITESPACE_RE.sub(' ', hours_elem.get_text(strip=True))
         
         return ""
     
-    def _extract_seats(self, soup: BeautifulSoup) -> str:
+    def _extract_seats(self, soup: BeautifulSoup, index: Optional[Dict[str, List]] = None) -> str:
         """席数を抽出"""
-        # 席数のパターン
-        seat_patterns = [
-            r'(\d+)\s*席',
-            r'席数\s*[:：]\s*(\d+)',
-            r'(\d+)\s*seats'
-        ]
+        if index is None:
+            index = self._index_page(soup)
         
         # テーブルから検索
-        for th in soup.find_all(['th', 'td'], string=re.compile('席数|座席')):
+        for th in index.get('label:seats', []):
             next_elem = th.find_next_sibling()
             if next_elem:
                 text = next_elem.get_text(strip=True)
-                for pattern in seat_patterns:
-                    match = re.search(pattern, text)
+                for pattern in SEAT_RES:
+                    match = pattern.search(text)
                     if match:
                         return match.group(1) + "席"
                 # パターンにマッチしなくても席数情報があれば返す
@@ -324,108 +629,78 @@ class TabelogEnhancedScraperV6:
                     return text
         
         # rstinfo-tableから検索
-        info_table = soup.select_one('.rstinfo-table')
+        info_table = self._select_indexed(index, ('rstinfo-table', None, None))
         if info_table:
             text = info_table.get_text()
-            for pattern in seat_patterns:
-                match = re.search(pattern, text)
+            for pattern in SEAT_RES:
+                match = pattern.search(text)
                 if match:
                     return match.group(1) + "席"
         
         return ""
     
-    def _extract_official_url(self, soup: BeautifulSoup) -> str:
+    def _extract_official_url(self, soup: BeautifulSoup, index: Optional[Dict[str, List]] = None) -> str:
         """公式サイトURLを抽出"""
-        # 公式サイトリンクのパターン
-        official_patterns = [
-            'ホームページ',
-            '公式',
-            'Official',
-            'HP',
-            'Website'
-        ]
+        if index is None:
+            index = self._index_page(soup)
         
-        # テーブルから検索
-        for pattern in official_patterns:
-            for th in soup.find_all(['th', 'td'], string=re.compile(pattern, re.IGNORECASE)):
+        # テーブルから検索（キーワードの優先順）
+        for i in range(len(OFFICIAL_KEYWORDS)):
+            for th in index.get(f'label:official{i}', []):
                 next_elem = th.find_next_sibling()
                 if next_elem:
                     link = next_elem.find('a')
                     if link and link.get('href'):
                         return link.get('href')
         
-        # 外部リンクから検索
-        for link in soup.find_all('a', href=True):
+        # 外部リンクから検索（公式っぽいリンクとSNSリンクを1回の走査で探す）
+        sns_link = ""
+        for link in index.get('a[href]', []):
             href = link.get('href', '')
-            text = link.get_text(strip=True)
             # 食べログ以外の外部リンクで公式っぽいもの
-            if 'tabelog.com' not in href and any(p in text for p in official_patterns):
-                if href.startswith('http'):
-                    return href
-        
-        # SNSリンク（Instagram, Twitter/X, Facebook）
-        sns_links = []
-        for link in soup.find_all('a', href=True):
-            href = link.get('href', '')
-            if any(sns in href for sns in ['instagram.com', 'twitter.com', 'x.com', 'facebook.com']):
-                sns_links.append(href)
-        
-        # SNSリンクがあれば最初のものを返す
-        if sns_links:
-            return sns_links[0]
-        
-        return ""
+            if (href.startswith('http') and 'tabelog.com' not in href
+                    and OFFICIAL_TEXT_RE.search(link.get_text(strip=True))):
+                return href
+            # SNSリンク（Instagram, Twitter/X, Facebook）は最初のものを控えておく
+            if not sns_link and any(sns in href for sns in SNS_HOSTS):
+                sns_link = href
+        
+        return sns_link
     
-    def _extract_review_count(self, soup: BeautifulSoup) -> str:
+    def _extract_review_count(self, soup: BeautifulSoup, index: Optional[Dict[str, List]] = None) -> str:
         """口コミ数を抽出"""
-        # 口コミ数のセレクタ
-        review_selectors = [
-            'em.rstdtl-rating__review-count',
-            'span.rstdtl-rating__review-count',
-            '.rdheader-rating__review-count em',
-            'em.rdheader-rating__review-count'
-        ]
+        if index is None:
+            index = self._index_page(soup)
         
-        for selector in review_selectors:
-            elem = soup.select_one(selector)
+        # 口コミ数のセレクタ
+        for selector in self.REVIEW_COUNT_SELECTORS:
+            elem = self._select_indexed(index, selector)
             if elem:
                 text = elem.get_text(strip=True)
                 # 数字のみ抽出
-                match = re.search(r'(\d+)', text)
+                match = DIGITS_RE.search(text)
                 if match:
                     return match.group(1)
         
-        # パターンマッチング
-        review_patterns = [
-            r'(\d+)\s*件の口コミ',
-            r'口コミ\s*(\d+)\s*件',
-            r'レビュー\s*(\d+)',
-            r'(\d+)\s*reviews'
-        ]
-        
-        text = soup.get_text()
-        for pattern in review_patterns:
-            match = re.search(pattern, text)
-            if match:
-                return match.group(1)
+        # パターンマッチング（ページ全体ではなく評価ブロックのテキストに絞る）
+        block = RATING_BLOCK_SELECTOR.select_one(soup) or soup.body or soup
+        match = REVIEW_RE.search(block.get_text())
+        if match:
+            return next(group for group in match.groups() if group)
         
         return "0"
     
-    def _extract_rating(self, soup: BeautifulSoup) -> str:
+    def _extract_rating(self, soup: BeautifulSoup, index: Optional[Dict[str, List]] = None) -> str:
         """評価点を抽出"""
-        rating_selectors = [
-            'span.rdheader-rating__score-val-dtl',
-            'b.c-rating__val',
-            'span.rstdtl-rating__score',
-            '.rdheader-rating__score em'
-        ]
+        if index is None:
+            index = self._index_page(soup)
         
-        for selector in rating_selectors:
-            elem = soup.select_one(selector)
+        for selector in self.RATING_SELECTORS:
+            elem = self._select_indexed(index, selector)
             if elem:
                 text = elem.get_text(strip=True)
                 # 数値のみ抽出（3.58 のような形式）
-                match = re.search(r'(\d+\.\d+)', text)
+                match = RATING_VALUE_RE.search(text)
                 if match:
                     return match.group(1)
         
@@ -433,19 +708,15 @@ class TabelogEnhancedScraperV6:
     
     def _extract_budget(self, soup: BeautifulSoup, meal_type: str) -> str:
         """予算を抽出"""
-        if meal_type == 'dinner':
-            keywords = ['夜', 'ディナー', '夕食']
-        else:
-            keywords = ['昼', 'ランチ', '昼食']
+        keywords = BUDGET_KEYWORD_RES['dinner' if meal_type == 'dinner' else 'lunch']
         
         # 予算情報を探す
         for keyword in keywords:
-            for elem in soup.find_all(string=re.compile(keyword)):
+            for elem in soup.find_all(string=keyword):
                 parent = elem.parent
                 if parent:
                     text = parent.get_text(strip=True)
-                    # 価格パターン（¥1,000～¥1,999 など）
-                    match = re.search(r'¥[\d,]+\s*[~～-]\s*¥[\d,]+', text)
+                    match = BUDGET_RANGE_RE.search(text)
                     if match:
                         return match.group()
         
@@ -457,17 +728,17 @@ class TabelogEnhancedScraperV6:
         
         for page in range(1, max_pages + 1):
             page_url = f"{area_url}rstLst/{page}/"
-            html = await self.fetch_page(page_url)
+            html = await self.fetch_page(page_url, as_bytes=True)
             
             if not html:
                 continue
             
-            soup = BeautifulSoup(html, 'html.parser')
+            soup = BeautifulSoup(html, HTML_PARSER, parse_only=LIST_LINK_STRAINER)
             
             # 店舗リンクを抽出
-            links = soup.select('a.list-rst__rst-name-target')
+            links = LIST_LINK_SELECTOR.select(soup)
             if not links:
-                links = soup.select('h3.list-rst__rst-name a')
+                links = LIST_LINK_FALLBACK_SELECTOR.select(soup)
             
             for link in links:
                 href = link.get('href', '')
@@ -497,7 +768,9 @@ class TabelogEnhancedScraperV6:
             'https://tabelog.com/tokyo/A1310/',  # 秋葉原・神田
         ]
         
+        # 収集しながら重複と処理済みURLを除く（収集順は保つ）
         all_urls = []
+        seen_urls = set(self.processed_urls)
         
         # 各エリアから店舗URLを収集
         for area_url in area_urls:
@@ -508,35 +781,44 @@ class TabelogEnhancedScraperV6:
             logger.info(f"📍 エリア {area_name} のデータ収集開始")
             
             urls = await self.scrape_restaurant_list(area_url, max_pages=10)
-            all_urls.extend(urls)
+            for url in urls:
+                if url not in seen_urls:
+                    seen_urls.add(url)
+                    all_urls.append(url)
             logger.info(f"  合計 {len(all_urls)} 件のURL収集済み")
         
-        # 重複を除去
-        all_urls = list(set(all_urls))[:target_count]
-        logger.info(f"📋 {len(all_urls)}件のユニークURLを処理します")
+        pending_urls = all_urls[:target_count]
+        logger.info(f"📋 {len(pending_urls)}件のユニークURLを処理します")
         
-        # 詳細情報を取得
-        for i, url in enumerate(all_urls):
+        # 詳細情報を取得（バッチ単位で並行実行し、同時接続数はfetch_pageのセマフォで制御）
+        batch_size = 50
+        for start in range(0, len(pending_urls), batch_size):
             if len(self.results) >= target_count:
                 break
             
-            if url in self.processed_urls:
-                continue
-            
-            logger.info(f"処理中 {i+1}/{len(all_urls)}: {url}")
-            result = await self.scrape_restaurant_enhanced(url)
+            batch = pending_urls[start:start + batch_size]
+            logger.info(f"処理中 {start + 1}-{start + len(batch)}/{len(pending_urls)}")
+            batch_results = await asyncio.gather(
+                *(self.scrape_restaurant_enhanced(url) for url in batch),
+                return_exceptions=True
+            )
             
-            if result:
+            for url, result in zip(batch, batch_results):
+                if isinstance(result, Exception):
+                    logger.error(f"  ❌ 取得エラー {url}: {result}")
+                    continue
+                if not result or len(self.results) >= target_count:
+                    continue
                 self.results.append(result)
+                self._append_result(result)
                 logger.info(f"  ✅ 収集成功: {result['shop_name']}")
                 logger.info(f"    席数: {result['seats'] or 'N/A'}")
                 logger.info(f"    公式URL: {result['official_url'] or 'N/A'}")
                 logger.info(f"    口コミ数: {result['review_count']}")
-                
-                # 10件ごとに保存
-                if len(self.results) % 10 == 0:
-                    self.save_progress()
-                    logger.info(f"💾 進捗保存: {len(self.results)}件")
+            
+            # バッチごとに保存
+            self.save_progress()
+            logger.info(f"💾 進捗保存: {len(self.results)}件")
         
         # 最終保存
         self.save_progress()
@@ -545,6 +827,30 @@ class TabelogEnhancedScraperV6:
         return self.results
 
 
+def write_excel(df, output_file: str, sheet_name: str = '飲食店リスト'):
+    """DataFrameをExcelに書き出し、カラム幅を内容に合わせて調整する"""
+    import pandas as pd
+    
+    # カラム幅はセルを1つずつ見ずに、列ごとの文字数の最大値から求める（見出しも含む）
+    widths = [
+        min(max(df[column].astype(str).str.len().max() if len(df) else 0, len(str(column))) + 2, 50)
+        for column in df.columns
+    ]
+    
+    engine = 'xlsxwriter' if HAS_XLSXWRITER else 'openpyxl'
+    with pd.ExcelWriter(output_file, engine=engine) as writer:
+        df.to_excel(writer, sheet_name=sheet_name, index=False)
+        
+        worksheet = writer.sheets[sheet_name]
+        if engine == 'xlsxwriter':
+            for i, width in enumerate(widths):
+                worksheet.set_column(i, i, width)
+        else:
+            from openpyxl.utils import get_column_letter
+            for i, width in enumerate(widths, start=1):
+                worksheet.column_dimensions[get_column_letter(i)].width = width
+
+
 async def main():
     """メイン処理"""
     async with TabelogEnhancedScraperV6(max_concurrent=5) as scraper:
@@ -576,30 +882,18 @@ async def main():
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             output_file = f'output/東京都_飲食店リスト_拡張_{len(results)}件_{timestamp}.xlsx'
             
-            with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name='飲食店リスト', index=False)
-                
-                # カラム幅を自動調整
-                worksheet = writer.sheets['飲食店リスト']
-                for column in worksheet.columns:
-                    max_length = 0
-                    column_letter = column[0].column_letter
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    adjusted_width = min(max_length + 2, 50)
-                    worksheet.column_dimensions[column_letter].width = adjusted_width
+            # 書き出しはブロッキング処理なのでスレッドで実行する
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(None, write_excel, df, output_file)
             
             logger.info(f"✅ Excelファイル作成: {output_file}")
             
-            # データ品質統計
-            with_seats = sum(1 for r in results if r.get('seats'))
-            with_official = sum(1 for r in results if r.get('official_url'))
-            with_reviews = sum(1 for r in results if r.get('review_count') and r['review_count'] != '0')
-            with_rating = sum(1 for r in results if r.get('rating'))
+            # データ品質統計（列ごとに値が入っている件数をまとめて数える）
+            filled = df.reindex(columns=['seats', 'official_url', 'review_count', 'rating']).fillna('').astype(str)
+            with_seats = int((filled['seats'] != '').sum())
+            with_official = int((filled['official_url'] != '').sum())
+            with_reviews = int(((filled['review_count'] != '') & (filled['review_count'] != '0')).sum())
+            with_rating = int((filled['rating'] != '').sum())
             
             logger.info(f"\n📊 データ品質:")
             logger.info(f"  席数情報: {with_seats}/{len(results)} ({with_seats/len(results)*100:.1f}%)")
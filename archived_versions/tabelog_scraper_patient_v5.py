@@ -10,12 +10,16 @@
 
 import asyncio
 import aiohttp
+import gzip
+import hashlib
 import json
 import re
 import random
 import time
 import os
 import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Set, Tuple
 from bs4 import BeautifulSoup
@@ -23,6 +27,11 @@ from pathlib import Path
 import logging
 from aiohttp import ClientTimeout, TCPConnector
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # ロギング設定
 logging.basicConfig(
     level=logging.INFO,
@@ -34,6 +43,58 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# HTMLパーサー（C実装のlxmlが使えればそちらを使う）
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+def _loads(raw):
+    """JSONをデコード（orjsonがあれば高速にデコード）"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def _dumps(data, indent: bool = False) -> bytes:
+    """JSONをUTF-8のバイト列にエンコード（orjsonがあれば高速にエンコード）"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(data, ensure_ascii=False, indent=2 if indent else None).encode('utf-8')
+
+# 再試行の設定（429や5xxはRetry-Afterまたは指数バックオフで待ってから再試行する）
+MAX_RETRIES = 3
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_BACKOFF = 30.0  # バックオフの上限（秒、ジッター分は除く）
+
+# 適応的な遅延の設定（直近のリクエストの429率に応じて基本遅延を伸縮する）
+ADAPTIVE_WINDOW = 50  # 429率を測る直近のリクエスト数
+ADAPTIVE_MIN_SAMPLES = 10  # これより少ない間は前回の倍率を使い続ける
+DELAY_MULTIPLIERS = ((0.02, 0.4), (0.10, 1.0))  # (429率の上限, 倍率)。どれにも当てはまらなければ下の値
+HOT_DELAY_MULTIPLIER = 2.5
+COOLDOWN_WINDOWS = 2  # 429率が高いウィンドウがこれだけ続いたら休止する
+COOLDOWN_SECONDS = 300
+
+# 取得済みHTMLのディスクキャッシュの有効期限（再実行時は待機も通信もせずに再利用）
+HTML_CACHE_TTL = 30 * 24 * 60 * 60  # 30日
+
+# 抽出用の正規表現（店舗ごと・リンクごとに使うのでモジュール読み込み時にコンパイル）
+RESTAURANT_HREF_RE = re.compile(r'/A\d+/A\d+/\d+/$')
+READING_PAREN_RE = re.compile(r'\s*\([^)]+\)\s*$')
+PHONE_DIGITS_RE = re.compile(r'[\d\-]+')
+WHITESPACE_RE = re.compile(r'\s+')
+
+# 店舗詳細で値を拾う要素（タグ, クラス名）→ 項目名（1回の走査で振り分ける）
+DETAIL_CLASS_FIELDS = {
+    ('h2', 'display-name'): 'shop_name',
+    ('span', 'rstinfo-table__tel-num'): 'phone',
+    ('p', 'rstinfo-table__address'): 'address',
+    ('p', 'rstinfo-table__open-hours'): 'open_time',
+    ('span', 'linktree__parent-target-text'): 'station',
+}
+# 1回の走査で集める項目数（クラスで拾う項目＋ジャンル）。すべて揃えば走査を打ち切る
+DETAIL_FIELD_COUNT = len(set(DETAIL_CLASS_FIELDS.values())) + 1
+
 class TabelogPatientScraperV5:
     """忍耐強い食べログスクレイパー"""
     
@@ -47,6 +108,12 @@ class TabelogPatientScraperV5:
         self.base_delay = 15.0  # 基本遅延15秒
         self.random_delay_range = (5.0, 10.0)  # 追加ランダム遅延
         
+        # 直近のリクエスト結果（Trueは429）から基本遅延の倍率を決める
+        self.delay_multiplier = 1.0
+        self._outcomes = deque(maxlen=ADAPTIVE_WINDOW)
+        self._window_requests = 0
+        self._hot_windows = 0
+        
         # 進捗管理
         self.processed_urls: Set[str] = set()
         self.results: List[Dict] = []
@@ -55,7 +122,14 @@ class TabelogPatientScraperV5:
         self.cache_dir = Path("cache")
         self.cache_dir.mkdir(exist_ok=True)
         self.progress_file = self.cache_dir / "patient_progress_v5.json"
-        self.results_file = self.cache_dir / "patient_results_v5.json"
+        # 取得結果は1件1行のJSONLに追記する（保存のたびに全件を書き直さない）
+        self.results_file = self.cache_dir / "patient_results_v5.jsonl"
+        self.legacy_results_file = self.cache_dir / "patient_results_v5.json"
+        self._persisted_count = 0  # results_file に書き込み済みの件数
+        self.html_cache_dir = self.cache_dir / "html"
+        self.html_cache_dir.mkdir(exist_ok=True)
+        # HTML解析用のスレッドプール（解析中もイベントループが待機や通信を進められるように）
+        self._parse_pool = None
         
         # 東京の全エリアURL
         self.area_base_urls = []
@@ -65,11 +139,23 @@ class TabelogPatientScraperV5:
     async def __aenter__(self):
         """非同期コンテキストマネージャ入口"""
         timeout = ClientTimeout(total=60, connect=20, sock_read=20)
+        # 接続先は食べログのみなので、keep-aliveで接続（TLSセッション）を使い回す
+        # （リクエスト間の待機が長いため、アイドル接続の保持時間も長めにする）
+        connector = TCPConnector(
+            limit=self.max_concurrent,
+            limit_per_host=self.max_concurrent,
+            keepalive_timeout=75,
+            ttl_dns_cache=600,
+            enable_cleanup_closed=True
+        )
         self.session = aiohttp.ClientSession(
             timeout=timeout,
+            connector=connector,
             headers=self._get_headers()
         )
         
+        self._parse_pool = ThreadPoolExecutor(max_workers=2)
+        
         # 前回の進捗を読み込む
         self.load_progress()
         return self
@@ -78,6 +164,9 @@ class TabelogPatientScraperV5:
         """非同期コンテキストマネージャ出口"""
         if self.session:
             await self.session.close()
+        if self._parse_pool:
+            self._parse_pool.shutdown(wait=True)
+            self._parse_pool = None
     
     def _get_headers(self) -> Dict[str, str]:
         """リクエストヘッダーを取得"""
@@ -92,61 +181,181 @@ class TabelogPatientScraperV5:
         }
     
     def load_progress(self):
-        """前回の進捗を読み込む"""
+        """前回の進捗を読み込む（処理済みURLは結果のJSONLから復元する）"""
         try:
-            if self.progress_file.exists():
-                with open(self.progress_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.processed_urls = set(data.get('processed_urls', []))
-                    logger.info(f"前回の進捗を読み込み: {len(self.processed_urls)}件処理済み")
-            
             if self.results_file.exists():
-                with open(self.results_file, 'r', encoding='utf-8') as f:
-                    self.results = json.load(f)
+                with open(self.results_file, 'rb') as f:
+                    for line in f:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        try:
+                            self.results.append(_loads(line))
+                        except ValueError:
+                            # 書き込み途中で中断された最終行は読み飛ばす
+                            logger.warning("結果ログの不完全な行をスキップしました")
+                self._persisted_count = len(self.results)
+                logger.info(f"前回の結果を読み込み: {len(self.results)}件")
+            elif self.legacy_results_file.exists():
+                # 旧形式（全件JSON）からの移行（次回の保存でJSONLに書き出す）
+                with open(self.legacy_results_file, 'rb') as f:
+                    self.results = _loads(f.read())
                     logger.info(f"前回の結果を読み込み: {len(self.results)}件")
+            
+            self.processed_urls = {r['url'] for r in self.results if r.get('url')}
+            if self.progress_file.exists():
+                with open(self.progress_file, 'rb') as f:
+                    data = _loads(f.read())
+                    # 旧形式の進捗ファイルに残っている処理済みURLも引き継ぐ
+                    self.processed_urls.update(data.get('processed_urls', []))
+                    self.delay_multiplier = data.get('delay_multiplier', self.delay_multiplier)
+            if self.processed_urls:
+                logger.info(f"前回の進捗を読み込み: {len(self.processed_urls)}件処理済み")
                 
         except Exception as e:
             logger.error(f"進捗読み込みエラー: {e}")
     
     def save_progress(self):
-        """進捗を保存"""
+        """進捗を保存（結果は前回の保存以降に増えた分だけをJSONLに追記）"""
         try:
-            with open(self.progress_file, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'processed_urls': list(self.processed_urls),
+            new_results = self.results[self._persisted_count:]
+            if new_results:
+                with open(self.results_file, 'ab') as f:
+                    # 前回が書き込み途中で中断していた場合、次の行と連結しないよう改行を補う
+                    if f.tell() > 0:
+                        with open(self.results_file, 'rb') as tail:
+                            tail.seek(-1, os.SEEK_END)
+                            if tail.read(1) != b'\n':
+                                f.write(b'\n')
+                    f.write(b''.join(_dumps(result) + b'\n' for result in new_results))
+                self._persisted_count = len(self.results)
+            
+            with open(self.progress_file, 'wb') as f:
+                f.write(_dumps({
                     'total_processed': len(self.processed_urls),
+                    'delay_multiplier': self.delay_multiplier,
                     'timestamp': datetime.now().isoformat()
-                }, f, ensure_ascii=False, indent=2)
-            
-            with open(self.results_file, 'w', encoding='utf-8') as f:
-                json.dump(self.results, f, ensure_ascii=False, indent=2)
+                }, indent=True))
                     
         except Exception as e:
             logger.error(f"進捗保存エラー: {e}")
     
-    async def patient_fetch(self, url: str) -> Optional[str]:
-        """忍耐強くページを取得"""
-        # 長い遅延
-        total_delay = self.base_delay + random.uniform(*self.random_delay_range)
+    def _cache_path(self, url: str) -> Path:
+        """URLに対応するキャッシュファイルのパス"""
+        return self.html_cache_dir / (hashlib.sha1(url.encode('utf-8')).hexdigest() + '.html.gz')
+    
+    def _read_cache(self, url: str) -> Optional[bytes]:
+        """有効期限内のキャッシュがあれば本文のバイト列を返す"""
+        path = self._cache_path(url)
+        try:
+            if time.time() - path.stat().st_mtime > HTML_CACHE_TTL:
+                return None
+            return gzip.decompress(path.read_bytes())
+        except (OSError, EOFError):
+            return None
+    
+    def _write_cache(self, url: str, body: bytes):
+        """取得した本文をキャッシュに保存"""
+        try:
+            self._cache_path(url).write_bytes(gzip.compress(body, compresslevel=5))
+        except OSError as e:
+            logger.warning(f"キャッシュ保存エラー {url}: {e}")
+    
+    async def patient_fetch(self, url: str) -> Optional[bytes]:
+        """
+        忍耐強くページを取得（429・5xx・タイムアウトは待機してから再試行）
+        
+        本文はデコードせずバイト列で返す（文字コードの判定とデコードはパーサーに任せる）
+        """
+        # キャッシュヒット時はアクセスしないので待機も不要
+        cached = self._read_cache(url)
+        if cached is not None:
+            logger.info(f"📦 キャッシュから取得: {url}")
+            return cached
+        
+        # 429が続いている場合は一旦休止し、再開後は少数のリクエストで状況を測り直す
+        if self._hot_windows >= COOLDOWN_WINDOWS:
+            logger.warning(f"🧊 レート制限が続いているため{COOLDOWN_SECONDS}秒休止します")
+            await asyncio.sleep(COOLDOWN_SECONDS)
+            self._outcomes.clear()
+            self._window_requests = 0
+            self._hot_windows = 0
+        
+        # 長い遅延（基本遅延は直近の429率に応じて伸縮）
+        total_delay = self.base_delay * self.delay_multiplier + random.uniform(*self.random_delay_range)
         logger.info(f"⏳ {total_delay:.1f}秒待機中...")
         await asyncio.sleep(total_delay)
         
-        try:
-            async with self.session.get(url) as response:
-                if response.status == 200:
-                    logger.info(f"✅ 取得成功: {url}")
-                    return await response.text()
-                elif response.status == 429:
-                    logger.warning(f"⚠️ レート制限検出。追加で60秒待機")
-                    await asyncio.sleep(60)
-                    return None
-                else:
-                    logger.warning(f"HTTPエラー {response.status}: {url}")
-                    return None
+        for attempt in range(MAX_RETRIES + 1):
+            status = None
+            retry_after = None
+            try:
+                # 通信そのものだけを同時接続数で制限する（待機や解析は枠を占有しない）
+                async with self.semaphore:
+                    async with self.session.get(url) as response:
+                        if response.status == 200:
+                            self._record_outcome(False)
+                            logger.info(f"✅ 取得成功: {url}")
+                            body = await response.read()
+                            self._write_cache(url, body)
+                            return body
+                        status = response.status
+                        if status == 429:
+                            self._record_outcome(True)
+                        retry_after = response.headers.get('Retry-After')
                     
-        except Exception as e:
-            logger.error(f"取得エラー {url}: {e}")
-            return None
+            except asyncio.TimeoutError:
+                logger.error(f"タイムアウト: {url}")
+            except Exception as e:
+                logger.error(f"取得エラー {url}: {e}")
+                return None
+            
+            if (status is not None and status not in RETRY_STATUSES) or attempt == MAX_RETRIES:
+                if status is not None:
+                    logger.warning(f"HTTPエラー {status}: {url}")
+                return None
+            
+            wait = self._retry_delay(attempt, retry_after)
+            if status == 429:
+                logger.warning(f"⚠️ レート制限検出。{wait:.1f}秒後に再試行（{attempt + 1}/{MAX_RETRIES}）")
+            else:
+                logger.warning(f"再試行します（{attempt + 1}/{MAX_RETRIES}、{wait:.1f}秒後）: {url}")
+            await asyncio.sleep(wait)
+        
+        return None
+    
+    def _record_outcome(self, rate_limited: bool):
+        """リクエスト結果を記録し、直近の429率から基本遅延の倍率を更新"""
+        self._outcomes.append(rate_limited)
+        rejection_rate = sum(self._outcomes) / len(self._outcomes)
+        
+        if len(self._outcomes) >= ADAPTIVE_MIN_SAMPLES:
+            multiplier = HOT_DELAY_MULTIPLIER
+            for max_rate, candidate in DELAY_MULTIPLIERS:
+                if rejection_rate < max_rate:
+                    multiplier = candidate
+                    break
+            if multiplier != self.delay_multiplier:
+                logger.info(f"🎚️ 基本遅延の倍率を変更: {self.delay_multiplier} → {multiplier}（429率 {rejection_rate:.1%}）")
+                self.delay_multiplier = multiplier
+        
+        # ウィンドウ分のリクエストごとに、429率が高い状態が続いているかを判定
+        self._window_requests += 1
+        if self._window_requests >= ADAPTIVE_WINDOW:
+            self._window_requests = 0
+            if rejection_rate >= DELAY_MULTIPLIERS[-1][0]:
+                self._hot_windows += 1
+            else:
+                self._hot_windows = 0
+    
+    def _retry_delay(self, attempt: int, retry_after: Optional[str]) -> float:
+        """再試行までの待機秒数（Retry-Afterがあればそれを優先し、なければ指数バックオフ＋ジッター）"""
+        if retry_after:
+            try:
+                return max(float(retry_after), 0.0)
+            except ValueError:
+                pass
+        return min(MAX_BACKOFF, self.base_delay * 2 ** attempt) * (1 + random.uniform(0, 0.5))
     
     async def scrape_list_page(self, url: str) -> List[str]:
         """リストページから店舗URLを抽出"""
@@ -154,37 +363,41 @@ class TabelogPatientScraperV5:
         if not html:
             return []
         
-        soup = BeautifulSoup(html, 'html.parser')
-        restaurant_urls = []
+        loop = asyncio.get_running_loop()
+        restaurant_urls = await loop.run_in_executor(self._parse_pool, self._parse_list, html)
+        
+        # 処理済みのURLはまとめて除く
+        restaurant_urls -= self.processed_urls
+        return list(restaurant_urls)
+    
+    def _parse_list(self, html: bytes) -> Set[str]:
+        """リストページのHTMLから店舗URLを抽出（スレッドプールで実行）"""
+        soup = BeautifulSoup(html, HTML_PARSER)
+        # 同じ店舗へのリンクが複数あるので最初から集合で集める
+        restaurant_urls: Set[str] = set()
         
         # シンプルなセレクタのみ使用
         links = soup.select('a[href*="/A"][href*="/A"]')
         for link in links:
             href = link.get('href', '')
-            if re.match(r'.*/A\d+/A\d+/\d+/$', href):
+            if RESTAURANT_HREF_RE.search(href):
                 full_url = f"https://tabelog.com{href}" if not href.startswith('http') else href
-                if full_url not in self.processed_urls:
-                    restaurant_urls.append(full_url)
+                restaurant_urls.add(full_url)
         
-        return list(set(restaurant_urls))
+        return restaurant_urls
     
-    async def scrape_restaurant_detail(self, url: str) -> Optional[Dict]:
-        """店舗詳細を取得"""
-        if url in self.processed_urls:
-            return None
-        
-        html = await self.patient_fetch(url)
-        if not html:
-            return None
-        
-        soup = BeautifulSoup(html, 'html.parser')
+    def _parse_detail(self, html: bytes, url: str) -> Optional[Dict]:
+        """店舗ページのHTMLから詳細を抽出（スレッドプールで実行するため、インスタンスの状態は変更しない）"""
+        soup = BeautifulSoup(html, HTML_PARSER)
+        elements = self._collect_detail_elements(soup)
         
         # 店名
         shop_name = ""
-        name_elem = soup.select_one('h2.display-name span') or soup.select_one('h2.display-name')
+        name_elem = elements.get('shop_name')
         if name_elem:
+            name_elem = name_elem.find('span') or name_elem
             shop_name = name_elem.get_text(strip=True)
-            shop_name = re.sub(r'\s*\([^)]+\)\s*$', '', shop_name)
+            shop_name = READING_PAREN_RE.sub('', shop_name)
         
         if not shop_name:
             return None
@@ -203,99 +416,165 @@ class TabelogPatientScraperV5:
         }
         
         # 電話番号
-        phone_elem = soup.select_one('span.rstinfo-table__tel-num')
+        phone_elem = elements.get('phone')
         if phone_elem:
-            phone_match = re.search(r'[\d\-]+', phone_elem.get_text())
+            phone_match = PHONE_DIGITS_RE.search(phone_elem.get_text())
             if phone_match:
                 info['phone'] = phone_match.group()
         
         # 住所
-        addr_elem = soup.select_one('p.rstinfo-table__address')
+        addr_elem = elements.get('address')
         if addr_elem:
             info['address'] = addr_elem.get_text(strip=True)
         
-        # ジャンル
-        for th in soup.find_all(['th', 'td'], string=re.compile('ジャンル')):
-            next_elem = th.find_next_sibling()
-            if next_elem:
-                info['genre'] = next_elem.get_text(strip=True)
-                break
+        # ジャンル（「ジャンル」ラベルのセルの次の要素）
+        genre_elem = elements.get('genre')
+        if genre_elem:
+            info['genre'] = genre_elem.get_text(strip=True)
         
         # 最寄り駅
-        for elem in soup.select('span.linktree__parent-target-text'):
-            text = elem.get_text(strip=True)
-            if '駅' in text:
-                info['station'] = text
-                break
+        station_elem = elements.get('station')
+        if station_elem:
+            info['station'] = station_elem.get_text(strip=True)
         
         # 営業時間
-        hours_elem = soup.select_one('p.rstinfo-table__open-hours')
+        hours_elem = elements.get('open_time')
         if hours_elem:
-            info['open_time'] = re.sub(r'\s+', ' ', hours_elem.get_text(strip=True))
+            info['open_time'] = WHITESPACE_RE.sub(' ', hours_elem.get_text(strip=True))
         
-        self.processed_urls.add(url)
         return info
     
-    async def scrape_restaurants_patient(self, target_count: int = 50000):
-        """忍耐強く大量収集"""
-        logger.info(f"🐢 忍耐モード起動: 目標 {target_count}件")
-        logger.info(f"⏱️ 基本遅延: {self.base_delay}秒 + ランダム{self.random_delay_range}秒")
-        
-        current_count = len(self.results)
-        if current_count >= target_count:
-            logger.info(f"既に目標数を達成: {current_count}件")
-            return
-        
-        # 各エリアを順番に処理
-        for area_url in self.area_base_urls:
-            if len(self.results) >= target_count:
-                break
-            
-            area_code = area_url.split('/')[-2]
-            logger.info(f"\n📍 エリア {area_code} の処理開始")
-            
-            # 各エリアで1-30ページまで
-            for page in range(1, 31):
+    async def _fetch_detail_pages(self, queue: asyncio.Queue, target_count: int):
+        """エリア・ページ順にリストページと店舗ページを取得し、店舗ページのHTMLをキューに渡す"""
+        queued_urls: Set[str] = set()  # 取得済みで解析待ちのURL（次のリストページでの重複取得を防ぐ）
+        try:
+            # 各エリアを順番に処理
+            for area_url in self.area_base_urls:
                 if len(self.results) >= target_count:
                     break
                 
-                list_url = f"{area_url}rstLst/{page}/"
-                logger.info(f"\n📄 ページ {page}/30 を処理中...")
-                
-                # リストページから店舗URL取得
-                restaurant_urls = await self.scrape_list_page(list_url)
-                logger.info(f"  → {len(restaurant_urls)}件の新規店舗URL発見")
+                area_code = area_url.split('/')[-2]
+                logger.info(f"\n📍 エリア {area_code} の処理開始")
                 
-                # 各店舗の詳細を取得
-                for i, rest_url in enumerate(restaurant_urls):
+                # 各エリアで1-30ページまで
+                for page in range(1, 31):
                     if len(self.results) >= target_count:
                         break
                     
-                    logger.info(f"\n🍴 店舗 {i+1}/{len(restaurant_urls)} を処理中...")
-                    result = await self.scrape_restaurant_detail(rest_url)
+                    list_url = f"{area_url}rstLst/{page}/"
+                    logger.info(f"\n📄 ページ {page}/30 を処理中...")
                     
-                    if result:
-                        self.results.append(result)
-                        current_count = len(self.results)
-                        logger.info(f"  ✅ 収集成功: {result['shop_name']} (合計: {current_count}件)")
-                        
-                        # 10件ごとに保存
-                        if current_count % 10 == 0:
-                            self.save_progress()
-                            logger.info(f"💾 進捗保存: {current_count}件")
+                    # リストページから店舗URL取得
+                    restaurant_urls = [
+                        rest_url for rest_url in await self.scrape_list_page(list_url)
+                        if rest_url not in queued_urls
+                    ]
+                    logger.info(f"  → {len(restaurant_urls)}件の新規店舗URL発見")
+                    
+                    # 各店舗のページを取得（解析はキューの先で行う）
+                    for i, rest_url in enumerate(restaurant_urls):
+                        if len(self.results) >= target_count:
+                            break
                         
-                        # 100件ごとに統計表示
-                        if current_count % 100 == 0:
-                            elapsed = (datetime.now() - datetime.fromisoformat(self.results[0]['scraped_at'])).total_seconds()
-                            rate = current_count / (elapsed / 3600)  # 件/時間
-                            eta_hours = (target_count - current_count) / rate if rate > 0 else 0
-                            logger.info(f"\n📊 統計:")
-                            logger.info(f"  収集速度: {rate:.1f}件/時間")
-                            logger.info(f"  推定完了時間: {eta_hours:.1f}時間後")
+                        logger.info(f"\n🍴 店舗 {i+1}/{len(restaurant_urls)} を処理中...")
+                        html = await self.patient_fetch(rest_url)
+                        if html:
+                            queued_urls.add(rest_url)
+                            await queue.put((rest_url, html))
+                
+                # エリア切り替え時は長めに休憩
+                logger.info(f"\n⏸️ エリア切り替え: 60秒休憩")
+                await asyncio.sleep(60)
+        finally:
+            # 解析側に終了を知らせる
+            await queue.put(None)
+    
+    async def _parse_detail_pages(self, queue: asyncio.Queue, target_count: int):
+        """キューから店舗ページのHTMLを受け取って解析し、結果を保存する"""
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            if len(self.results) >= target_count:
+                continue
             
-            # エリア切り替え時は長めに休憩
-            logger.info(f"\n⏸️ エリア切り替え: 60秒休憩")
-            await asyncio.sleep(60)
+            rest_url, html = item
+            result = await loop.run_in_executor(self._parse_pool, self._parse_detail, html, rest_url)
+            
+            if result:
+                self.processed_urls.add(rest_url)
+                self.results.append(result)
+                current_count = len(self.results)
+                logger.info(f"  ✅ 収集成功: {result['shop_name']} (合計: {current_count}件)")
+                
+                # 10件ごとに保存
+                if current_count % 10 == 0:
+                    self.save_progress()
+                    logger.info(f"💾 進捗保存: {current_count}件")
+                
+                # 100件ごとに統計表示
+                if current_count % 100 == 0:
+                    elapsed = (datetime.now() - datetime.fromisoformat(self.results[0]['scraped_at'])).total_seconds()
+                    rate = current_count / (elapsed / 3600)  # 件/時間
+                    eta_hours = (target_count - current_count) / rate if rate > 0 else 0
+                    logger.info(f"\n📊 統計:")
+                    logger.info(f"  収集速度: {rate:.1f}件/時間")
+                    logger.info(f"  推定完了時間: {eta_hours:.1f}時間後")
+    
+    def _collect_detail_elements(self, soup: BeautifulSoup) -> Dict:
+        """
+        ページを1回だけ走査し、各項目の値を持つ要素（それぞれ文書順で最初のもの）を集める
+        
+        ジャンルは自身の文字列（.string）に「ジャンル」を含むth/tdの次の要素、
+        最寄り駅は「駅」を含むパンくずの要素を採用する
+        （表を内包するレイアウト用のセルは子孫のテキストでは判定しない）
+        """
+        elements = {}
+        for elem in soup.find_all(['h2', 'span', 'p', 'th', 'td']):
+            if len(elements) == DETAIL_FIELD_COUNT:
+                break
+            if elem.name in ('th', 'td'):
+                if 'genre' in elements:
+                    continue
+                # セル自身の文字列だけを見る（子孫のテキストを毎回連結しない）
+                label = elem.string
+                if label and 'ジャンル' in label:
+                    value_elem = elem.find_next_sibling()
+                    if value_elem:
+                        elements['genre'] = value_elem
+                continue
+            
+            for class_name in elem.get('class') or ():
+                field = DETAIL_CLASS_FIELDS.get((elem.name, class_name))
+                if not field or field in elements:
+                    continue
+                if field == 'station' and '駅' not in elem.get_text():
+                    continue
+                elements[field] = elem
+        return elements
+    
+    async def scrape_restaurants_patient(self, target_count: int = 50000):
+        """忍耐強く大量収集"""
+        logger.info(f"🐢 忍耐モード起動: 目標 {target_count}件")
+        logger.info(f"⏱️ 基本遅延: {self.base_delay}秒 + ランダム{self.random_delay_range}秒")
+        
+        current_count = len(self.results)
+        if current_count >= target_count:
+            logger.info(f"既に目標数を達成: {current_count}件")
+            return
+        
+        # 取得（待機＋通信）と解析をパイプライン化し、店舗ページの解析は次の取得の待機中に行う
+        # （通信は取得側の1本だけなので、リクエストの間隔は従来どおり）
+        detail_queue: asyncio.Queue = asyncio.Queue(maxsize=2)
+        producer = asyncio.ensure_future(self._fetch_detail_pages(detail_queue, target_count))
+        try:
+            await self._parse_detail_pages(detail_queue, target_count)
+        except BaseException:
+            producer.cancel()
+            raise
+        # 取得側で例外が起きていればここで送出する
+        await producer
         
         # 最終保存
         self.save_progress()
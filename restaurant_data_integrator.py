@@ -6,11 +6,10 @@
 食べログとホットペッパーのデータを統合してExcelファイルに出力
 """
 
-import pandas as pd
 import openpyxl
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils.dataframe import dataframe_to_rows
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterable
 import logging
 from datetime import datetime
 import re
@@ -19,6 +18,37 @@ import re
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# メインデータシートの列
+MAIN_HEADERS = ['No', '店名', '電話番号', '住所', 'ジャンル', '最寄り駅', '営業時間', 'データソース', 'URL', '調査日']
+
+# 列幅
+MAIN_COLUMN_WIDTHS = {
+    'A': 5,   # No
+    'B': 30,  # 店名
+    'C': 15,  # 電話番号
+    'D': 40,  # 住所
+    'E': 15,  # ジャンル
+    'F': 20,  # 最寄り駅
+    'G': 25,  # 営業時間
+    'H': 12,  # データソース
+    'I': 50,  # URL
+    'J': 12   # 調査日
+}
+
+# ヘッダースタイル
+HEADER_FONT = Font(bold=True, color="FFFFFF")
+HEADER_FILL = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+HEADER_ALIGNMENT = Alignment(horizontal="center", vertical="center")
+DATA_ALIGNMENT = Alignment(vertical="center")
+
+# 罫線
+THIN_BORDER = Border(
+    left=Side(style='thin'),
+    right=Side(style='thin'),
+    top=Side(style='thin'),
+    bottom=Side(style='thin')
+)
+
 class RestaurantDataIntegrator:
     """飲食店データ統合クラス"""
     
@@ -36,6 +66,17 @@ class RestaurantDataIntegrator:
         self.restaurants.extend(restaurant_list)
         logger.info(f"{len(restaurant_list)}件の飲食店データを追加しました")
     
+    def add_restaurants_iter(self, restaurants: Iterable[Dict]):
+        """
+        飲食店データを逐次追加（呼び出し側で中間リストを作らずに渡せる）
+        
+        Args:
+            restaurants (Iterable[Dict]): 飲食店データのイテラブル
+        """
+        before = len(self.restaurants)
+        self.restaurants.extend(restaurants)
+        logger.info(f"{len(self.restaurants) - before}件の飲食店データを追加しました")
+    
     def clean_phone_number(self, phone: str) -> str:
         """
         電話番号を正規化
@@ -139,12 +180,14 @@ class RestaurantDataIntegrator:
         
         logger.info(f"データ検証: {invalid_count}件の無効データを除去、{len(valid_restaurants)}件が有効")
     
-    def create_excel_report(self, filename: str = None) -> str:
+    def create_excel_report(self, filename: str = None, restaurants: Optional[Iterable[Dict]] = None) -> str:
         """
-        Excelレポートを作成
+        Excelレポートを作成（write_onlyモードで1行ずつディスクへ書き出す）
         
         Args:
             filename (str): ファイル名（省略時は自動生成）
+            restaurants (Iterable[Dict], optional): 出力するデータ（省略時は統合済みデータ）。
+                1回の走査で書き出すため、ジェネレーターも渡せる
             
         Returns:
             str: 作成されたファイルのパス
@@ -153,131 +196,83 @@ class RestaurantDataIntegrator:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"飲食店営業リスト_{timestamp}.xlsx"
         
-        # データフレーム作成
-        df_data = []
-        for i, restaurant in enumerate(self.restaurants, 1):
-            df_data.append({
-                'No': i,
-                '店名': restaurant.get('shop_name', ''),
-                '電話番号': restaurant.get('phone', ''),
-                '住所': restaurant.get('address', ''),
-                'ジャンル': restaurant.get('genre', ''),
-                '最寄り駅': restaurant.get('station', ''),
-                '営業時間': restaurant.get('open_time', ''),
-                'データソース': restaurant.get('source', ''),
-                'URL': restaurant.get('url', ''),
-                '調査日': datetime.now().strftime("%Y-%m-%d")
-            })
+        if restaurants is None:
+            restaurants = self.restaurants
         
-        df = pd.DataFrame(df_data)
+        wb = openpyxl.Workbook(write_only=True)
+        survey_date = datetime.now().strftime("%Y-%m-%d")
         
-        # Excelファイル作成
-        with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-            # メインデータシート
-            df.to_excel(writer, sheet_name='飲食店リスト', index=False)
-            
-            # サマリーシート
-            summary_data = {
-                '項目': [
-                    '総件数',
-                    '電話番号あり',
-                    '住所あり',
-                    'ジャンルあり',
-                    '食べログ',
-                    'ホットペッパー',
-                    '作成日時'
-                ],
-                '値': [
-                    len(self.restaurants),
-                    len([r for r in self.restaurants if r.get('phone')]),
-                    len([r for r in self.restaurants if r.get('address')]),
-                    len([r for r in self.restaurants if r.get('genre')]),
-                    len([r for r in self.restaurants if r.get('source') == '食べログ']),
-                    len([r for r in self.restaurants if r.get('source') == 'ホットペッパー']),
-                    datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                ]
-            }
+        # メインデータシート（write_onlyモードでは列幅を行の書き込み前に設定する）
+        ws_main = wb.create_sheet('飲食店リスト')
+        for col, width in MAIN_COLUMN_WIDTHS.items():
+            ws_main.column_dimensions[col].width = width
+        ws_main.append(self._styled_row(ws_main, MAIN_HEADERS, header=True))
+        
+        # サマリー用の件数は書き込みと同じ走査で集計
+        total_count = with_phone = with_address = with_genre = tabelog_count = hotpepper_count = 0
+        for i, restaurant in enumerate(restaurants, 1):
+            total_count = i
+            ws_main.append(self._styled_row(ws_main, [
+                i,
+                restaurant.get('shop_name', ''),
+                restaurant.get('phone', ''),
+                restaurant.get('address', ''),
+                restaurant.get('genre', ''),
+                restaurant.get('station', ''),
+                restaurant.get('open_time', ''),
+                restaurant.get('source', ''),
+                restaurant.get('url', ''),
+                survey_date
+            ]))
             
-            summary_df = pd.DataFrame(summary_data)
-            summary_df.to_excel(writer, sheet_name='サマリー', index=False)
+            if restaurant.get('phone'):
+                with_phone += 1
+            if restaurant.get('address'):
+                with_address += 1
+            if restaurant.get('genre'):
+                with_genre += 1
+            source = restaurant.get('source')
+            if source == '食べログ':
+                tabelog_count += 1
+            elif source == 'ホットペッパー':
+                hotpepper_count += 1
+        
+        # サマリーシート
+        ws_summary = wb.create_sheet('サマリー')
+        ws_summary.column_dimensions['A'].width = 20
+        ws_summary.column_dimensions['B'].width = 25
+        ws_summary.append(self._styled_row(ws_summary, ['項目', '値'], header=True))
+        summary_rows = [
+            ('総件数', total_count),
+            ('電話番号あり', with_phone),
+            ('住所あり', with_address),
+            ('ジャンルあり', with_genre),
+            ('食べログ', tabelog_count),
+            ('ホットペッパー', hotpepper_count),
+            ('作成日時', datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        ]
+        for row in summary_rows:
+            ws_summary.append(self._styled_row(ws_summary, row))
         
-        # スタイル適用
-        self._apply_excel_styling(filename)
+        wb.save(filename)
         
         logger.info(f"Excelファイルを作成しました: {filename}")
         return filename
     
-    def _apply_excel_styling(self, filename: str):
-        """Excelファイルにスタイルを適用"""
-        wb = openpyxl.load_workbook(filename)
-        
-        # メインデータシートのスタイル
-        ws_main = wb['飲食店リスト']
-        
-        # ヘッダースタイル
-        header_font = Font(bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        header_alignment = Alignment(horizontal="center", vertical="center")
-        
-        # 罫線
-        thin_border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-        
-        # ヘッダー行にスタイル適用
-        for cell in ws_main[1]:
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = header_alignment
-            cell.border = thin_border
-        
-        # データ行にスタイル適用
-        for row in ws_main.iter_rows(min_row=2, max_row=ws_main.max_row):
-            for cell in row:
-                cell.border = thin_border
-                cell.alignment = Alignment(vertical="center")
-        
-        # 列幅調整
-        column_widths = {
-            'A': 5,   # No
-            'B': 30,  # 店名
-            'C': 15,  # 電話番号
-            'D': 40,  # 住所
-            'E': 15,  # ジャンル
-            'F': 20,  # 最寄り駅
-            'G': 25,  # 営業時間
-            'H': 12,  # データソース
-            'I': 50,  # URL
-            'J': 12   # 調査日
-        }
-        
-        for col, width in column_widths.items():
-            ws_main.column_dimensions[col].width = width
-        
-        # サマリーシートのスタイル
-        ws_summary = wb['サマリー']
-        
-        # ヘッダー行にスタイル適用
-        for cell in ws_summary[1]:
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = header_alignment
-            cell.border = thin_border
-        
-        # データ行にスタイル適用
-        for row in ws_summary.iter_rows(min_row=2, max_row=ws_summary.max_row):
-            for cell in row:
-                cell.border = thin_border
-                cell.alignment = Alignment(vertical="center")
-        
-        # 列幅調整
-        ws_summary.column_dimensions['A'].width = 20
-        ws_summary.column_dimensions['B'].width = 25
-        
-        wb.save(filename)
+    def _styled_row(self, ws, values, header: bool = False) -> List[WriteOnlyCell]:
+        """スタイルを適用したセルの行を作成"""
+        cells = []
+        for value in values:
+            cell = WriteOnlyCell(ws, value=value)
+            cell.border = THIN_BORDER
+            if header:
+                cell.font = HEADER_FONT
+                cell.fill = HEADER_FILL
+                cell.alignment = HEADER_ALIGNMENT
+            else:
+                cell.alignment = DATA_ALIGNMENT
+            cells.append(cell)
+        return cells
     
     def get_statistics(self) -> Dict:
         """統計情報を取得"""